@@ -0,0 +1,8 @@
+# Copyright (c) 2025 MiroMind
+# This source code is licensed under the Apache 2.0 License.
+
+import sys
+from pathlib import Path
+
+# The utils scripts are run directly, so import them as top-level modules
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "utils"))
@@ -0,0 +1,49 @@
+# Copyright (c) 2025 MiroMind
+# This source code is licensed under the Apache 2.0 License.
+
+import json
+
+import merge_chatml_msgs_to_one_json as merge
+
+
+def _write(path, content: bytes):
+    path.write_bytes(content)
+    return path
+
+
+def test_merge_json_files(tmp_path, monkeypatch):
+    # A window smaller than the file count exercises the sliding read-ahead
+    monkeypatch.setattr(merge, "READ_AHEAD", 2)
+    for i in range(5):
+        _write(
+            tmp_path / f"task_{i}_main_agent.json",
+            f'[{{"role": "user", "content": "q{i}"}}]\n'.encode(),
+        )
+    _write(tmp_path / "task_5_main_agent.json", b"[{not json")
+    _write(tmp_path / "task_6_main_agent.json", b'\xef\xbb\xbf[{"role": "user"}]')
+    _write(tmp_path / "task_0_agent-browsing.json", '["café"]'.encode())
+    _write(tmp_path / "notes_main_agent.txt", b"[]")
+
+    merge.merge_json_files(str(tmp_path), types=("main_agent", "agent-browsing"))
+
+    main_merged = (tmp_path / "main_agent_merged.json").read_bytes()
+    assert main_merged == (
+        b"[\n"
+        + b",\n".join(
+            f'{{"messages": [{{"role": "user", "content": "q{i}"}}]}}'.encode()
+            for i in range(5)
+        )
+        + b"\n]\n"
+    )
+    assert [c["messages"][0]["content"] for c in json.loads(main_merged)] == [
+        f"q{i}" for i in range(5)
+    ]
+
+    browsing_merged = (tmp_path / "agent-browsing_merged.json").read_bytes()
+    assert browsing_merged == '[\n{"messages": ["café"]}\n]\n'.encode()
+
+
+def test_merge_json_files_without_matches(tmp_path):
+    merge.merge_json_files(str(tmp_path), types=("main_agent",))
+    assert (tmp_path / "main_agent_merged.json").read_bytes() == b"[\n\n]\n"
+    assert json.loads((tmp_path / "main_agent_merged.json").read_bytes()) == []
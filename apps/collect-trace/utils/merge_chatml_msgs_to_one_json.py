@@ -2,41 +2,101 @@
 # This source code is licensed under the Apache 2.0 License.
 
 import argparse
-import glob
 import json
 import os
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
 
+try:
+    import orjson
+except ImportError:  # orjson is optional, fall back to the stdlib codec
+    orjson = None
 
-def merge_json_files(input_dir, type="main"):
-    # List to store all messages
-    all_conversations = []
+# Reading is I/O-bound, so use more threads than cores
+MAX_WORKERS = min(32, (os.cpu_count() or 4) * 4)
 
-    # Get all JSON files matching the pattern
-    json_files = glob.glob(os.path.join(input_dir, f"*{type}*.json"))
+# Files submitted ahead of the writer; bounds how many are held in memory
+READ_AHEAD = MAX_WORKERS * 2
 
-    # Read each JSON file and merge its content
+
+def _load_json_file(json_file):
+    try:
+        # Unbuffered FileIO.readall() sizes its buffer from fstat and reads the
+        # whole file in one go, which is then decoded from bytes in one call
+        with open(json_file, "rb", buffering=0) as f:
+            raw = f.read()
+        # Only validate here; the raw bytes are what gets merged, so they must
+        # be plain UTF-8. Decode explicitly for json.loads, which would also
+        # accept a BOM or UTF-16/32 bytes (orjson rejects those itself).
+        orjson.loads(raw) if orjson else json.loads(raw.decode("utf-8"))
+        print(f"Successfully processed: {json_file}")
+        return json_file, raw.strip()
+    except Exception as e:
+        print(f"Error processing {json_file}: {str(e)}")
+        return json_file, None
+
+
+def _find_json_files(input_dir, types):
+    """Bucket the JSON files in input_dir by type with a single directory scan."""
+    buckets = {type: [] for type in types}
+    with os.scandir(input_dir) as it:
+        for entry in it:
+            if not entry.name.endswith(".json") or not entry.is_file():
+                continue
+            for type in types:
+                if type in entry.name:
+                    buckets[type].append(entry.path)
+    # scandir order is arbitrary; sort so the merged output is reproducible
+    for json_files in buckets.values():
+        json_files.sort()
+    return buckets
+
+
+def _load_json_files_in_order(executor, json_files):
+    """Yield _load_json_file results in input order, reading ahead a bounded window."""
+    pending = deque()
     for json_file in json_files:
-        try:
-            with open(json_file, "r", encoding="utf-8") as f:
-                data = json.load(f)
-                conversation = {
-                    "messages": data,
-                }
-                all_conversations.append(conversation)
-            print(f"Successfully processed: {json_file}")
-        except Exception as e:
-            print(f"Error processing {json_file}: {str(e)}")
-
-    output_file = os.path.join(input_dir, f"{type}_merged.json")
-    # Write the merged data to a new JSON file
-    with open(output_file, "w", encoding="utf-8") as f:
-        json.dump(all_conversations, f, ensure_ascii=False, indent=2)
+        pending.append(executor.submit(_load_json_file, json_file))
+        if len(pending) >= READ_AHEAD:
+            yield pending.popleft().result()
+    while pending:
+        yield pending.popleft().result()
+
+
+def _merge_files(json_files, output_file, type):
+    # Number of conversations written to the merged file
+    num_conversations = 0
+
+    # Stream each conversation into the output array as soon as it is loaded,
+    # so at most READ_AHEAD files' raw bytes are held in memory
+    with open(output_file, "wb") as out:
+        out.write(b"[\n")
+        # Read the JSON files concurrently, writing them in input order
+        with ThreadPoolExecutor(max_workers=MAX_WORKERS) as executor:
+            for _, raw in _load_json_files_in_order(executor, json_files):
+                if raw is None:
+                    continue
+                # Wrap the file's bytes as {"messages": ...} without re-encoding
+                if num_conversations:
+                    out.write(b",\n")
+                out.write(b'{"messages": ' + raw + b"}")
+                num_conversations += 1
+        out.write(b"\n]\n")
 
     print(
         f"\nMerging complete! All {type} JSON files have been merged into {output_file}"
     )
     print(f"Total number of files processed: {len(json_files)}")
-    print(f"Total number of messages: {len(all_conversations)}")
+    print(f"Total number of messages: {num_conversations}")
+
+
+def merge_json_files(input_dir, types=("main",)):
+    # Get all JSON files matching each type in one pass over the directory
+    buckets = _find_json_files(input_dir, types)
+
+    for type, json_files in buckets.items():
+        output_file = os.path.join(input_dir, f"{type}_merged.json")
+        _merge_files(json_files, output_file, type)
 
 
 def main():
@@ -52,8 +112,7 @@ def main():
 
     args = parser.parse_args()
 
-    merge_json_files(args.input_dir, type="main_agent")
-    merge_json_files(args.input_dir, type="agent-browsing")
+    merge_json_files(args.input_dir, types=("main_agent", "agent-browsing"))
 
 
 if __name__ == "__main__":
@@ -2,14 +2,15 @@ import asyncio
 import json
 import logging
 import os
+import re
 import threading
 import time
-import uuid
 from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from typing import AsyncGenerator, List, Optional
+from typing import AsyncGenerator, Dict, List, Optional, Tuple
 
 import gradio as gr
+import orjson
 from dotenv import load_dotenv
 from hydra import compose, initialize_config_dir
 from omegaconf import DictConfig
@@ -36,6 +37,17 @@ os.environ["DEMO_MODE"] = "1"
 # Load environment variables from .env file
 load_dotenv()
 
+# Minimum seconds between UI re-renders while streaming
+MIN_RENDER_INTERVAL = float(os.getenv("MIN_RENDER_INTERVAL", "0.05"))
+
+# Pipelines run for minutes each, so they get their own thread pool instead of
+# tying up the event loop's default executor (DNS lookups, gradio helpers)
+MAX_CONCURRENT_PIPELINES = int(os.getenv("MAX_CONCURRENT_PIPELINES", "64"))
+pipeline_executor = ThreadPoolExecutor(
+    max_workers=MAX_CONCURRENT_PIPELINES, thread_name_prefix="pipeline"
+)
+atexit.register(pipeline_executor.shutdown, wait=False)
+
 # Global Hydra initialization flag
 _hydra_initialized = False
 
@@ -151,17 +163,24 @@ def _ensure_preloaded():
         main_agent_tool_manager, sub_agent_tool_managers, output_formatter = (
             create_pipeline_components(cfg)
         )
-        tool_definitions = asyncio.run(
-            main_agent_tool_manager.get_all_tool_definitions()
+
+        async def _collect_tool_definitions():
+            # Fetch all managers' tool definitions concurrently on one loop
+            main_defs, *sub_defs = await asyncio.gather(
+                main_agent_tool_manager.get_all_tool_definitions(),
+                *(
+                    sub_agent_tool_manager.get_all_tool_definitions()
+                    for sub_agent_tool_manager in sub_agent_tool_managers.values()
+                ),
+            )
+            return main_defs, dict(zip(sub_agent_tool_managers.keys(), sub_defs))
+
+        tool_definitions, sub_agent_tool_definitions = asyncio.run(
+            _collect_tool_definitions()
         )
         if cfg.agent.sub_agents:
             tool_definitions += expose_sub_agents_as_tools(cfg.agent.sub_agents)
 
-        sub_agent_tool_definitions = {
-            name: asyncio.run(sub_agent_tool_manager.get_all_tool_definitions())
-            for name, sub_agent_tool_manager in sub_agent_tool_managers.items()
-        }
-
         _preload_cache["cfg"] = cfg
         _preload_cache["main_agent_tool_manager"] = main_agent_tool_manager
         _preload_cache["sub_agent_tool_managers"] = sub_agent_tool_managers
@@ -172,13 +191,20 @@ def _ensure_preloaded():
         logger.info("Pipeline components loaded successfully.")
 
 
+# Maximum number of undelivered stream events buffered per request
+STREAM_QUEUE_MAXSIZE = 1024
+
+
 class ThreadSafeAsyncQueue:
-    """Thread-safe async queue wrapper"""
+    """Thread-safe async queue wrapper with a bounded buffer"""
 
-    def __init__(self):
-        self._queue = asyncio.Queue()
+    def __init__(self, maxsize: int = STREAM_QUEUE_MAXSIZE):
+        self._queue = asyncio.Queue(maxsize=maxsize)
         self._loop = None
         self._closed = False
+        # Puts scheduled from other threads that have not finished yet
+        self._pending_puts = set()
+        self._pending_lock = threading.Lock()
 
     def set_loop(self, loop):
         self._loop = loop
@@ -189,18 +215,35 @@ class ThreadSafeAsyncQueue:
             return
         await self._queue.put(item)
 
-    def put_nowait_threadsafe(self, item):
-        """Put data from other threads - use direct queue put for lower latency"""
-        if self._closed or not self._loop:
+    async def put_threadsafe(self, item):
+        """Put data from another thread's event loop, waiting while the buffer is full"""
+        if self._closed or not self._loop or not self._loop.is_running():
             return
-        # Use put_nowait directly instead of creating a task for lower latency
-        self._loop.call_soon_threadsafe(lambda: self._queue.put_nowait(item))
+        future = asyncio.run_coroutine_threadsafe(self._queue.put(item), self._loop)
+        # Tracked so close() can cancel puts that would wait forever
+        with self._pending_lock:
+            self._pending_puts.add(future)
+        future.add_done_callback(self._discard_pending_put)
+        await asyncio.wrap_future(future)
+
+    def _discard_pending_put(self, future):
+        with self._pending_lock:
+            self._pending_puts.discard(future)
 
     async def get(self):
         return await self._queue.get()
 
+    def empty(self) -> bool:
+        return self._queue.empty()
+
     def close(self):
         self._closed = True
+        # Nobody reads from the queue any more, so puts waiting for space
+        # would never finish
+        with self._pending_lock:
+            pending = list(self._pending_puts)
+        for future in pending:
+            future.cancel()
 
 
 def filter_google_search_organic(organic: List[dict]) -> List[dict]:
@@ -218,14 +261,26 @@ def filter_google_search_organic(organic: List[dict]) -> List[dict]:
     return result
 
 
+# JSON may only be preceded by these whitespace characters
+_MARKUP_START_RE = re.compile(r"[ \t\n\r]*<")
+
+
+def _is_markup(result) -> bool:
+    """Cheap pre-check: text whose first non-blank character is '<' (e.g. raw
+    HTML) can never parse as JSON, so it is not worth parsing"""
+    return isinstance(result, str) and _MARKUP_START_RE.match(result) is not None
+
+
 def is_scrape_error(result: str) -> bool:
     """
     Check if the scrape result is an error
     """
+    if _is_markup(result):
+        return True
     try:
-        json.loads(result)
+        orjson.loads(result)
         return False
-    except json.JSONDecodeError:
+    except orjson.JSONDecodeError:
         return True
 
 
@@ -239,16 +294,20 @@ def filter_message(message: dict) -> dict:
         if (
             tool_name == "google_search"
             and isinstance(tool_input, dict)
-            and "result" in tool_input
+            and isinstance(tool_input.get("result"), str)
+            and not _is_markup(tool_input["result"])
         ):
-            result_dict = json.loads(tool_input["result"])
+            try:
+                result_dict = orjson.loads(tool_input["result"])
+            except orjson.JSONDecodeError:
+                result_dict = {}
             if "organic" in result_dict:
                 new_result = {
                     "organic": filter_google_search_organic(result_dict["organic"])
                 }
-                message["data"]["tool_input"]["result"] = json.dumps(
-                    new_result, ensure_ascii=False
-                )
+                message["data"]["tool_input"]["result"] = orjson.dumps(
+                    new_result
+                ).decode()
         if (
             tool_name in ["scrape", "scrape_website"]
             and isinstance(tool_input, dict)
@@ -263,7 +322,10 @@ def filter_message(message: dict) -> dict:
 
 
 async def stream_events_optimized(
-    task_id: str, query: str, _: Optional[dict] = None, disconnect_check=None
+    task_id: str,
+    query: str,
+    _: Optional[dict] = None,
+    stop_event: Optional[asyncio.Event] = None,
 ) -> AsyncGenerator[dict, None]:
     """Optimized event stream generator that directly outputs structured events, no longer wrapped as SSE strings."""
     workflow_id = task_id
@@ -277,9 +339,19 @@ async def stream_events_optimized(
     cancel_event = threading.Event()
 
     def run_pipeline_in_thread():
+        loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(loop)
+
+        def send_final_event(item):
+            """Send an event after the pipeline ends, waiting for space like any other"""
+            if cancel_event.is_set():
+                return  # the consumer has stopped reading
+            try:
+                loop.run_until_complete(stream_queue.put_threadsafe(item))
+            except asyncio.CancelledError:
+                pass  # the queue was closed while waiting for space
+
         try:
-            loop = asyncio.new_event_loop()
-            asyncio.set_event_loop(loop)
 
             class ThreadQueueWrapper:
                 def __init__(self, thread_queue, cancel_event):
@@ -290,7 +362,8 @@ async def stream_events_optimized(
                     if self.cancel_event.is_set():
                         logger.info("Pipeline cancelled, stopping execution")
                         return
-                    self.thread_queue.put_nowait_threadsafe(filter_message(item))
+                    # Waits while the consumer is STREAM_QUEUE_MAXSIZE events behind
+                    await self.thread_queue.put_threadsafe(filter_message(item))
 
             wrapper_queue = ThreadQueueWrapper(stream_queue, cancel_event)
 
@@ -350,52 +423,66 @@ async def stream_events_optimized(
         except Exception as e:
             if not cancel_event.is_set():
                 logger.error(f"Pipeline error: {e}", exc_info=True)
-                stream_queue.put_nowait_threadsafe(
+                send_final_event(
                     {
                         "event": "error",
                         "data": {"error": str(e), "workflow_id": workflow_id},
                     }
                 )
         finally:
-            stream_queue.put_nowait_threadsafe(None)
-            if "loop" in locals():
-                loop.close()
+            send_final_event(None)
+            loop.close()
+
+    # The pipeline makes blocking LLM calls, so it runs on its own event loop in
+    # a worker thread from the dedicated pipeline pool
+    pipeline_future = asyncio.get_running_loop().run_in_executor(
+        pipeline_executor, run_pipeline_in_thread
+    )
 
-    executor = ThreadPoolExecutor(max_workers=1)
-    future = executor.submit(run_pipeline_in_thread)
+    # Wake up as soon as either an event arrives or the client asks to stop
+    stop_wait = asyncio.ensure_future(stop_event.wait()) if stop_event else None
+    get_task = None
 
     try:
         while True:
-            try:
-                if disconnect_check and await disconnect_check():
-                    logger.info("Client disconnected, stopping pipeline")
-                    cancel_event.set()
-                    break
-                message = await asyncio.wait_for(stream_queue.get(), timeout=0.1)
+            if get_task is None:
+                get_task = asyncio.ensure_future(stream_queue.get())
+            waiters = {get_task} if stop_wait is None else {get_task, stop_wait}
+            done, _ = await asyncio.wait(
+                waiters, timeout=0.1, return_when=asyncio.FIRST_COMPLETED
+            )
+            if stop_wait in done:
+                logger.info("Client disconnected, stopping pipeline")
+                cancel_event.set()
+                break
+            if get_task in done:
+                message = get_task.result()
+                get_task = None
                 if message is None:
                     logger.info("Pipeline completed")
                     break
                 yield message
                 last_send_time = time.time()
-            except asyncio.TimeoutError:
-                current_time = time.time()
-                if current_time - last_send_time > 300:
-                    logger.info("Stream timeout")
-                    break
-                if future.done():
-                    try:
-                        message = stream_queue._queue.get_nowait()
-                        if message is not None:
-                            yield message
-                            continue
-                    except Exception:
-                        break
-                if current_time - last_heartbeat_time >= 15:
-                    yield {
-                        "event": "heartbeat",
-                        "data": {"timestamp": current_time, "workflow_id": workflow_id},
-                    }
-                    last_heartbeat_time = current_time
+                continue
+
+            # Nothing arrived within the timeout
+            current_time = time.time()
+            if current_time - last_send_time > 300:
+                logger.info("Stream timeout")
+                break
+            if pipeline_future.done() and stream_queue.empty():
+                break
+            # Also heartbeat as soon as the stream goes idle after sending,
+            # so consumers that coalesce events can flush what they hold
+            if (
+                current_time - last_heartbeat_time >= 15
+                or last_send_time > last_heartbeat_time
+            ):
+                yield {
+                    "event": "heartbeat",
+                    "data": {"timestamp": current_time, "workflow_id": workflow_id},
+                }
+                last_heartbeat_time = current_time
     except Exception as e:
         logger.error(f"Stream error: {e}", exc_info=True)
         yield {
@@ -403,15 +490,17 @@ async def stream_events_optimized(
             "data": {"workflow_id": workflow_id, "error": f"Stream error: {str(e)}"},
         }
     finally:
+        for waiter in (get_task, stop_wait):
+            if waiter is not None:
+                waiter.cancel()
         cancel_event.set()  # Signal pipeline to stop
         try:
-            # Wait longer for pipeline thread to finish
-            future.result(timeout=5.0)
+            # Wait longer for pipeline thread to finish without blocking the loop
+            await asyncio.wait_for(asyncio.shield(pipeline_future), timeout=5.0)
         except Exception:
             pass  # Thread may have been cancelled
         finally:
             stream_queue.close()  # Close queue after thread is done
-            executor.shutdown(wait=True, cancel_futures=True)
 
 
 # ========================= Gradio Integration =========================
@@ -423,6 +512,7 @@ def _init_render_state():
         "agents": {},  # agent_id -> {"agent_name": str, "tool_call_order": [], "tools": {tool_call_id: {...}}}
         "current_agent_id": None,
         "errors": [],
+        "fragments": {},  # (agent_id, tool_call_id) -> cached _render_tool_call result
     }
 
 
@@ -630,9 +720,94 @@ def _format_scrape_results(tool_input: dict, tool_output: dict) -> str:
     return "\n".join(lines)
 
 
+def _render_tool_call(call: dict, is_final_summary: bool) -> Tuple[bool, str]:
+    """Render a single tool call, returning (belongs_to_final_summary, text)."""
+    lines = []
+    tool_name = call.get("tool_name", "unknown_tool")
+
+    # Show text / message - display directly
+    if tool_name in ("show_text", "message"):
+        return is_final_summary, call.get("content", "")
+
+    tool_input = call.get("input", {})
+    tool_output = call.get("output", {})
+    has_input = not _is_empty_payload(tool_input)
+    has_output = not _is_empty_payload(tool_output)
+
+    # Special formatting for google_search
+    if tool_name == "google_search" and (has_input or has_output):
+        return False, _format_search_results(tool_input, tool_output)
+
+    # Special formatting for sogou_search
+    if tool_name == "sogou_search" and (has_input or has_output):
+        return False, _format_sogou_search_results(tool_input, tool_output)
+
+    # Special formatting for scrape/webpage tools
+    if tool_name in (
+        "scrape",
+        "scrape_website",
+        "scrape_webpage",
+        "scrape_and_extract_info",
+    ) and (has_input or has_output):
+        return False, _format_scrape_results(tool_input, tool_output)
+
+    # Special formatting for code execution tools
+    if tool_name in ("python", "run_python_code") and (has_input or has_output):
+        # Use pure Markdown to avoid HTML wrapper blocking Markdown rendering
+        lines.append("\n---\n")
+        lines.append("#### 💻 Code Execution\n")
+        # Show code input - try multiple possible keys
+        code = ""
+        if isinstance(tool_input, dict):
+            code = tool_input.get("code") or tool_input.get("code_block") or ""
+        elif isinstance(tool_input, str):
+            code = tool_input
+        if code:
+            lines.append(f"\n```python\n{code}\n```\n")
+        # Show output if available
+        if has_output:
+            output = ""
+            if isinstance(tool_output, dict):
+                output = (
+                    tool_output.get("result")
+                    or tool_output.get("output")
+                    or tool_output.get("stdout")
+                    or ""
+                )
+            elif isinstance(tool_output, str):
+                output = tool_output
+            if isinstance(output, str) and output.strip():
+                lines.append("\n**Output:**\n")
+                lines.append(
+                    f'\n```text\n{output[:1000]}{"..." if len(output) > 1000 else ""}\n```\n'
+                )
+        lines.append("\n✅ Executed\n")
+        return False, "\n".join(lines)
+
+    # Other tools - show as compact card
+    if has_input or has_output:
+        lines.append('<div class="tool-card">')
+        lines.append(f'<div class="tool-header">🔧 {tool_name}</div>')
+        if has_input:
+            # Show brief input summary
+            if isinstance(tool_input, dict):
+                brief = ", ".join(
+                    f"{k}: {str(v)[:30]}..." if len(str(v)) > 30 else f"{k}: {v}"
+                    for k, v in list(tool_input.items())[:2]
+                )
+                lines.append(f'<div class="tool-brief">{brief}</div>')
+        if has_output:
+            lines.append('<div class="tool-status">✓ Done</div>')
+        lines.append("</div>")
+    return is_final_summary, "\n".join(lines)
+
+
 def _render_markdown(state: dict) -> str:
     lines = []
     final_summary_lines = []  # Collect final summary content separately
+    # Rendered fragments of unchanged tool calls are reused across renders;
+    # _update_state_with_event drops the entry of any call it touches
+    fragments = state.setdefault("fragments", {})
 
     # Render errors first if any
     if state.get("errors"):
@@ -642,105 +817,19 @@ def _render_markdown(state: dict) -> str:
     # Render all agents' content
     for agent_id in state.get("agent_order", []):
         agent = state["agents"].get(agent_id, {})
-        agent_name = agent.get("agent_name", "")
-        is_final_summary = agent_name == "Final Summary"
+        is_final_summary = agent.get("agent_name", "") == "Final Summary"
 
         for call_id in agent.get("tool_call_order", []):
-            call = agent["tools"].get(call_id, {})
-            tool_name = call.get("tool_name", "unknown_tool")
-
-            # Show text / message - display directly
-            if tool_name in ("show_text", "message"):
-                content = call.get("content", "")
-                if content:
-                    if is_final_summary:
-                        final_summary_lines.append(content)
-                    else:
-                        lines.append(content)
-                continue
-
-            tool_input = call.get("input", {})
-            tool_output = call.get("output", {})
-            has_input = not _is_empty_payload(tool_input)
-            has_output = not _is_empty_payload(tool_output)
-
-            # Special formatting for google_search
-            if tool_name == "google_search" and (has_input or has_output):
-                formatted = _format_search_results(tool_input, tool_output)
-                if formatted:
-                    lines.append(formatted)
-                continue
-
-            # Special formatting for sogou_search
-            if tool_name == "sogou_search" and (has_input or has_output):
-                formatted = _format_sogou_search_results(tool_input, tool_output)
-                if formatted:
-                    lines.append(formatted)
-                continue
-
-            # Special formatting for scrape/webpage tools
-            if tool_name in (
-                "scrape",
-                "scrape_website",
-                "scrape_webpage",
-                "scrape_and_extract_info",
-            ) and (has_input or has_output):
-                formatted = _format_scrape_results(tool_input, tool_output)
-                if formatted:
-                    lines.append(formatted)
-                continue
-
-            # Special formatting for code execution tools
-            if tool_name in ("python", "run_python_code") and (has_input or has_output):
-                # Use pure Markdown to avoid HTML wrapper blocking Markdown rendering
-                lines.append("\n---\n")
-                lines.append("#### 💻 Code Execution\n")
-                # Show code input - try multiple possible keys
-                code = ""
-                if isinstance(tool_input, dict):
-                    code = tool_input.get("code") or tool_input.get("code_block") or ""
-                elif isinstance(tool_input, str):
-                    code = tool_input
-                if code:
-                    lines.append(f"\n```python\n{code}\n```\n")
-                # Show output if available
-                if has_output:
-                    output = ""
-                    if isinstance(tool_output, dict):
-                        output = (
-                            tool_output.get("result")
-                            or tool_output.get("output")
-                            or tool_output.get("stdout")
-                            or ""
-                        )
-                    elif isinstance(tool_output, str):
-                        output = tool_output
-                    if isinstance(output, str) and output.strip():
-                        lines.append("\n**Output:**\n")
-                        lines.append(
-                            f'\n```text\n{output[:1000]}{"..." if len(output) > 1000 else ""}\n```\n'
-                        )
-                lines.append("\n✅ Executed\n")
-                continue
-
-            # Other tools - show as compact card
-            if has_input or has_output:
-                target_lines = final_summary_lines if is_final_summary else lines
-                target_lines.append('<div class="tool-card">')
-                target_lines.append(f'<div class="tool-header">🔧 {tool_name}</div>')
-                if has_input:
-                    # Show brief input summary
-                    if isinstance(tool_input, dict):
-                        brief = ", ".join(
-                            f"{k}: {str(v)[:30]}..."
-                            if len(str(v)) > 30
-                            else f"{k}: {v}"
-                            for k, v in list(tool_input.items())[:2]
-                        )
-                        target_lines.append(f'<div class="tool-brief">{brief}</div>')
-                if has_output:
-                    target_lines.append('<div class="tool-status">✓ Done</div>')
-                target_lines.append("</div>")
+            key = (agent_id, call_id)
+            fragment = fragments.get(key)
+            if fragment is None:
+                fragment = _render_tool_call(
+                    agent["tools"].get(call_id, {}), is_final_summary
+                )
+                fragments[key] = fragment
+            to_summary, text = fragment
+            if text:
+                (final_summary_lines if to_summary else lines).append(text)
 
     # Add final summary with Markdown-based styling (no HTML wrapper to preserve Markdown rendering)
     if final_summary_lines:
@@ -784,6 +873,7 @@ def _update_state_with_event(state: dict, message: dict):
             tools[tool_call_id] = {"tool_name": tool_name}
             agent["tool_call_order"].append(tool_call_id)
         entry = tools[tool_call_id]
+        state["fragments"].pop((agent_id, tool_call_id), None)
         if tool_name == "show_text" and "delta_input" in data:
             delta = data.get("delta_input", {}).get("text", "")
             _append_show_text(entry, delta)
@@ -828,6 +918,7 @@ def _update_state_with_event(state: dict, message: dict):
             tools[message_id] = {"tool_name": "message"}
             agent["tool_call_order"].append(message_id)
         entry = tools[message_id]
+        state["fragments"].pop((agent_id, message_id), None)
         delta_content = (data.get("delta") or {}).get("content", "")
         if isinstance(delta_content, str) and delta_content:
             _append_show_text(entry, delta_content)
@@ -847,23 +938,8 @@ def _update_state_with_event(state: dict, message: dict):
     return state
 
 
-_CANCEL_FLAGS = {}
-_CANCEL_LOCK = threading.Lock()
-
-
-def _set_cancel_flag(task_id: str):
-    with _CANCEL_LOCK:
-        _CANCEL_FLAGS[task_id] = True
-
-
-def _reset_cancel_flag(task_id: str):
-    with _CANCEL_LOCK:
-        _CANCEL_FLAGS[task_id] = False
-
-
-async def _disconnect_check_for_task(task_id: str):
-    with _CANCEL_LOCK:
-        return _CANCEL_FLAGS.get(task_id, False)
+# task_id -> event set by the Stop button; only touched from the event loop
+_CANCEL_EVENTS: Dict[str, asyncio.Event] = {}
 
 
 def _spinner_markup(running: bool) -> str:
@@ -879,8 +955,9 @@ def _spinner_markup(running: bool) -> str:
 
 async def gradio_run(query: str, ui_state: Optional[dict]):
     query = replace_chinese_punctuation(query or "")
-    task_id = str(uuid.uuid4())
-    _reset_cancel_flag(task_id)
+    # Only used for in-process bookkeeping and log names, 64 random bits suffice
+    task_id = os.urandom(8).hex()
+    stop_event = _CANCEL_EVENTS[task_id] = asyncio.Event()
     if not ui_state:
         ui_state = {"task_id": task_id}
     else:
@@ -893,24 +970,34 @@ async def gradio_run(query: str, ui_state: Optional[dict]):
         gr.update(interactive=True),
         ui_state,
     )
-    async for message in stream_events_optimized(
-        task_id, query, None, lambda: _disconnect_check_for_task(task_id)
-    ):
-        # Skip heartbeat events - they don't need UI update
-        event_type = message.get("event", "unknown")
-        if event_type == "heartbeat":
-            continue
-
-        state = _update_state_with_event(state, message)
-        md = _render_markdown(state)
-        yield (
-            md + _spinner_markup(True),
-            gr.update(interactive=False),
-            gr.update(interactive=True),
-            ui_state,
-        )
-        # Small delay to allow Gradio to process the update
-        await asyncio.sleep(0.01)
+    last_render_time = time.monotonic()
+    pending_update = False
+    try:
+        async for message in stream_events_optimized(task_id, query, None, stop_event):
+            # Heartbeat events carry no content, they only flush pending updates
+            event_type = message.get("event", "unknown")
+            if event_type != "heartbeat":
+                state = _update_state_with_event(state, message)
+                pending_update = True
+                # Coalesce bursts of events into at most one render per interval
+                if time.monotonic() - last_render_time < MIN_RENDER_INTERVAL:
+                    continue
+            if not pending_update:
+                continue
+
+            md = _render_markdown(state)
+            yield (
+                md + _spinner_markup(True),
+                gr.update(interactive=False),
+                gr.update(interactive=True),
+                ui_state,
+            )
+            last_render_time = time.monotonic()
+            pending_update = False
+            # Small delay to allow Gradio to process the update
+            await asyncio.sleep(0.01)
+    finally:
+        _CANCEL_EVENTS.pop(task_id, None)
     # End: enable Run, disable Stop, remove spinner
     yield (
         _render_markdown(state),
@@ -920,10 +1007,10 @@ async def gradio_run(query: str, ui_state: Optional[dict]):
     )
 
 
-def stop_current(ui_state: Optional[dict]):
+async def stop_current(ui_state: Optional[dict]):
     tid = (ui_state or {}).get("task_id")
-    if tid:
-        _set_cancel_flag(tid)
+    if tid in _CANCEL_EVENTS:
+        _CANCEL_EVENTS[tid].set()
     # Immediately switch button availability: enable Run, disable Stop
     return (
         gr.update(interactive=True),
@@ -113,6 +113,9 @@ def _detect_language(text: str) -> str:
 
 _patched = False
 
+# Upper bound on cached system prompts (one per tool-definition list)
+_SYSTEM_PROMPT_CACHE_SIZE = 16
+
 
 def apply_prompt_patch():
     """
@@ -147,10 +150,23 @@ def _patch_system_prompt():
     # Store original function
     original_generate_mcp_system_prompt = prompt_utils.generate_mcp_system_prompt
 
+    # The demo preloads its tool definitions once and passes the same lists on
+    # every request, so prompts are cached per list identity and date. Each
+    # entry holds the list itself, so its id cannot be reused by another one.
+    system_prompt_cache = {}
+
     def patched_generate_mcp_system_prompt(date, mcp_servers):
         """Patched version that prepends custom identity prompt."""
-        original_prompt = original_generate_mcp_system_prompt(date, mcp_servers)
-        return CUSTOM_IDENTITY_PROMPT + original_prompt
+        cached = system_prompt_cache.get(id(mcp_servers))
+        if cached is not None and cached[0] is mcp_servers and cached[1] == date:
+            return cached[2]
+        prompt = CUSTOM_IDENTITY_PROMPT + original_generate_mcp_system_prompt(
+            date, mcp_servers
+        )
+        if len(system_prompt_cache) >= _SYSTEM_PROMPT_CACHE_SIZE:
+            system_prompt_cache.clear()
+        system_prompt_cache[id(mcp_servers)] = (mcp_servers, date, prompt)
+        return prompt
 
     # Apply patches to all modules that import and use this function
     prompt_utils.generate_mcp_system_prompt = patched_generate_mcp_system_prompt
@@ -1,5 +1,39 @@
 import re
 
+# Chinese character Unicode ranges:
+# \u4e00-\u9fff: CJK Unified Ideographs
+# \u3400-\u4dbf: CJK Extension A
+# \uf900-\ufaff: CJK Compatibility Ideographs
+# \u3000-\u303f: CJK Symbols and Punctuation
+# \uff00-\uffef: Fullwidth ASCII, Fullwidth punctuation
+_CHINESE_RE = re.compile(
+    r"[\u4e00-\u9fff\u3400-\u4dbf\uf900-\ufaff\u3000-\u303f\uff00-\uffef]"
+)
+
+# Single-character Chinese punctuation replacements for str.translate
+_PUNCT_MAP = str.maketrans(
+    {
+        "，": ",",
+        "。": ".",
+        "！": "!",
+        "？": "?",
+        "；": ";",
+        "：": ":",
+        "“": '"',
+        "”": '"',
+        "‘": "'",
+        "’": "'",
+        "（": "(",
+        "）": ")",
+        "【": "[",
+        "】": "]",
+        "《": "<",
+        "》": ">",
+        "、": ",",
+        "—": "-",
+    }
+)
+
 
 def contains_chinese(text):
     """
@@ -11,43 +45,19 @@ def contains_chinese(text):
     Returns:
         bool: True if contains Chinese characters or punctuation, False otherwise
     """
-    # Chinese character Unicode ranges:
-    # \u4e00-\u9fff: CJK Unified Ideographs
-    # \u3400-\u4dbf: CJK Extension A
-    # \uf900-\ufaff: CJK Compatibility Ideographs
-    # \u3000-\u303f: CJK Symbols and Punctuation
-    # \uff00-\uffef: Fullwidth ASCII, Fullwidth punctuation
-    chinese_pattern = re.compile(
-        r"[\u4e00-\u9fff\u3400-\u4dbf\uf900-\ufaff\u3000-\u303f\uff00-\uffef]"
-    )
-    return bool(chinese_pattern.search(text))
+    # All target ranges are non-ASCII, so pure-ASCII input can be rejected
+    # without entering the regex engine
+    if text.isascii():
+        return False
+    return _CHINESE_RE.search(text) is not None
 
 
 def replace_chinese_punctuation(text):
-    # Handle single-character replacements with translate
-    punctuation_map = str.maketrans(
-        {
-            "，": ",",
-            "。": ".",
-            "！": "!",
-            "？": "?",
-            "；": ";",
-            "：": ":",
-            "“": '"',
-            "”": '"',
-            "‘": "'",
-            "’": "'",
-            "（": "(",
-            "）": ")",
-            "【": "[",
-            "】": "]",
-            "《": "<",
-            "》": ">",
-            "、": ",",
-            "—": "-",
-        }
-    )
+    # Nothing to replace in pure-ASCII input
+    if text.isascii():
+        return text
     # First, replace multi-character punctuation
-    text = text.replace("……", "...")
+    if "……" in text:
+        text = text.replace("……", "...")
     # Then apply single-character replacements
-    return text.translate(punctuation_map)
+    return text.translate(_PUNCT_MAP)
@@ -14,7 +14,6 @@ import json
 from collections.abc import Sequence
 
 import json_repair
-import regex as re
 from vllm.entrypoints.chat_utils import make_tool_call_id
 from vllm.entrypoints.openai.protocol import (
     ChatCompletionRequest,
@@ -33,6 +32,116 @@ from vllm.logger import init_logger
 
 logger = init_logger(__name__)
 
+TOOL_CALL_START = "<use_mcp_tool>"
+TOOL_CALL_END = "</use_mcp_tool>"
+_SERVER_OPEN, _SERVER_CLOSE = "<server_name>", "</server_name>"
+_TOOL_OPEN, _TOOL_CLOSE = "<tool_name>", "</tool_name>"
+_ARGS_OPEN, _ARGS_CLOSE = "<arguments>", "</arguments>"
+
+
+def _skip_ws(text: str, pos: int) -> int:
+    n = len(text)
+    while pos < n and text[pos].isspace():
+        pos += 1
+    return pos
+
+
+def _read_tag(
+    text: str, pos: int, open_tag: str, close_tag: str
+) -> tuple[str, int] | None:
+    """
+    Read ``<tag>value</tag>`` at pos; value runs to the first close tag and
+    may contain '<'. Returns the stripped value and the position after
+    trailing whitespace.
+    """
+    if not text.startswith(open_tag, pos):
+        return None
+    start = pos + len(open_tag)
+    close = text.find(close_tag, start)
+    if close < 0:
+        return None
+    return text[start:close].strip(), _skip_ws(text, close + len(close_tag))
+
+
+def _parse_tool_call(text: str, pos: int) -> tuple[str, str, str, int] | None:
+    """
+    Parse one strict tool call whose start token ends at pos.
+    Returns (server_name, tool_name, arguments, end) or None.
+    """
+    pos = _skip_ws(text, pos)
+    server = _read_tag(text, pos, _SERVER_OPEN, _SERVER_CLOSE)
+    if server is None:
+        return None
+    server_name, pos = server
+    tool = _read_tag(text, pos, _TOOL_OPEN, _TOOL_CLOSE)
+    if tool is None:
+        return None
+    tool_name, pos = tool
+    if not text.startswith(_ARGS_OPEN, pos):
+        return None
+    args_start = _skip_ws(text, pos + len(_ARGS_OPEN))
+    # Arguments end at the first </arguments> that is followed by the end token
+    close = text.find(_ARGS_CLOSE, args_start)
+    while close >= 0:
+        end = _skip_ws(text, close + len(_ARGS_CLOSE))
+        if text.startswith(TOOL_CALL_END, end):
+            arguments = text[args_start:close].rstrip()
+            return server_name, tool_name, arguments, end + len(TOOL_CALL_END)
+        close = text.find(_ARGS_CLOSE, close + 1)
+    return None
+
+
+def _iter_tool_calls(text: str):
+    """Yield (server_name, tool_name, arguments) for every complete tool call."""
+    pos = text.find(TOOL_CALL_START)
+    while pos >= 0:
+        parsed = _parse_tool_call(text, pos + len(TOOL_CALL_START))
+        if parsed is None:
+            pos = text.find(TOOL_CALL_START, pos + 1)
+            continue
+        server_name, tool_name, arguments, pos = parsed
+        yield server_name, tool_name, arguments
+        pos = text.find(TOOL_CALL_START, pos)
+
+
+def _parse_block_body(block: str, pos: int) -> tuple[str, str, str] | None:
+    end = len(block) - len(TOOL_CALL_END)
+    pos = _skip_ws(block, pos)
+    server_name = tool_name = arguments = ""
+    if block.startswith(_SERVER_OPEN, pos):
+        server = _read_tag(block, pos, _SERVER_OPEN, _SERVER_CLOSE)
+        if server is None:
+            return None
+        server_name, pos = server
+    if block.startswith(_TOOL_OPEN, pos):
+        tool = _read_tag(block, pos, _TOOL_OPEN, _TOOL_CLOSE)
+        if tool is None:
+            return None
+        tool_name, pos = tool
+    if block.startswith(_ARGS_OPEN, pos):
+        arguments = block[_skip_ws(block, pos + len(_ARGS_OPEN)) : end].rstrip()
+        if arguments.endswith(_ARGS_CLOSE):
+            arguments = arguments[: -len(_ARGS_CLOSE)].rstrip()
+    elif pos != end:
+        return None
+    return server_name, tool_name, arguments
+
+
+def _parse_tool_block(block: str) -> tuple[str, str, str] | None:
+    """
+    Leniently parse a single block that starts with TOOL_CALL_START and ends
+    with TOOL_CALL_END. Every section is optional and </arguments> may be
+    missing. Absent sections come back as "". A repeated start token inside
+    the block is tolerated: parsing resumes from the first one that works.
+    """
+    start = 0
+    while start >= 0:
+        parsed = _parse_block_body(block, start + len(TOOL_CALL_START))
+        if parsed is not None:
+            return parsed
+        start = block.find(TOOL_CALL_START, start + 1)
+    return None
+
 
 class MirothinkerToolParser(ToolParser):
     def __init__(self, tokenizer):
@@ -50,47 +159,14 @@ class MirothinkerToolParser(ToolParser):
         self._stream_mode: str = "text"  # "text" | "tool"
         self._text_token_prefix: str = ""  # possible prefix of <use_mcp_tool>
         self._tool_end_token_prefix: str = ""  # possible prefix of </use_mcp_tool>
-        self._tool_block_buffer: str = (
-            ""  # accumulates between <use_mcp_tool> and </use_mcp_tool>
-        )
+        # Chunks between <use_mcp_tool> and </use_mcp_tool>, joined once the
+        # block closes so long arguments are not re-copied on every delta
+        self._tool_block_parts: list[str] = []
         self._stream_tool_call_ids: list[str] = []
 
         # Token definitions
-        self.tool_call_start_token: str = "<use_mcp_tool>"
-        self.tool_call_end_token: str = "</use_mcp_tool>"
-
-        # Regex patterns
-        self.tool_call_regex = re.compile(
-            r"<use_mcp_tool>\s*"
-            r"<server_name>(.*?)</server_name>\s*"
-            r"<tool_name>(.*?)</tool_name>\s*"
-            r"<arguments>\s*(.*?)\s*</arguments>\s*"
-            r"</use_mcp_tool>",
-            re.DOTALL,
-        )
-
-        # For streaming partial tool calls
-        # IMPORTANT: Use GREEDY matching (.*) for arguments to capture all content
-        # in streaming mode. We'll clean up </arguments> tag in the code if present.
-        # The outer ()? makes the whole <arguments> section optional
-        # The inner (.*) will match empty string if <arguments> exists but has no content yet
-        self.partial_tool_regex = re.compile(
-            r"<use_mcp_tool>\s*"
-            r"(?:<server_name>(.*?)</server_name>\s*)?"
-            r"(?:<tool_name>(.*?)</tool_name>\s*)?"
-            r"(?:<arguments>(\s*.*))?",  # Move \s* inside capture group so empty match returns ""
-            re.DOTALL,
-        )
-
-        # For correctness-first parsing on COMPLETE tool blocks only
-        self._complete_tool_block_regex = re.compile(
-            r"<use_mcp_tool>\s*"
-            r"(?:<server_name>(.*?)</server_name>\s*)?"
-            r"(?:<tool_name>(.*?)</tool_name>\s*)?"
-            r"(?:<arguments>\s*(.*?)\s*(?:</arguments>\s*)?)?"
-            r"</use_mcp_tool>",
-            re.DOTALL,
-        )
+        self.tool_call_start_token: str = TOOL_CALL_START
+        self.tool_call_end_token: str = TOOL_CALL_END
 
     def _resolve_tool_name(
         self, server_name: str, tool_name: str, request: ChatCompletionRequest
@@ -177,11 +253,8 @@ class MirothinkerToolParser(ToolParser):
             had_any_match = False
             had_parse_error = False
             # Find all complete tool calls
-            for match in self.tool_call_regex.finditer(model_output):
+            for server_name, tool_name, arguments_str in _iter_tool_calls(model_output):
                 had_any_match = True
-                server_name = match.group(1).strip()
-                tool_name = match.group(2).strip()
-                arguments_str = match.group(3).strip()
 
                 # Resolve tool name
                 tool_name = self._resolve_tool_name(server_name, tool_name, request)
@@ -271,7 +344,7 @@ class MirothinkerToolParser(ToolParser):
             self._stream_mode = "text"
             self._text_token_prefix = ""
             self._tool_end_token_prefix = ""
-            self._tool_block_buffer = ""
+            self._tool_block_parts = []
             self._stream_tool_call_ids = []
 
         # If tools are disabled for this request, do not suppress tags or parse tool calls.
@@ -284,9 +357,9 @@ class MirothinkerToolParser(ToolParser):
             if self._text_token_prefix:
                 out += self._text_token_prefix
                 self._text_token_prefix = ""
-            if self._tool_block_buffer:
-                out += self.tool_call_start_token + self._tool_block_buffer
-                self._tool_block_buffer = ""
+            if self._tool_block_parts:
+                out += self.tool_call_start_token + "".join(self._tool_block_parts)
+                self._tool_block_parts = []
             if self._tool_end_token_prefix:
                 out += self._tool_end_token_prefix
                 self._tool_end_token_prefix = ""
@@ -294,10 +367,13 @@ class MirothinkerToolParser(ToolParser):
             return DeltaMessage(content=out) if out else None
 
         def _longest_token_prefix_at_end(s: str, token: str) -> str:
-            max_len = min(len(token) - 1, len(s))
-            for i in range(max_len, 0, -1):
-                if token.startswith(s[-i:]):
-                    return s[-i:]
+            # A partial token must begin with the token's first character, so
+            # only those positions in the tail are candidates (usually none).
+            idx = s.find(token[0], max(len(s) - len(token) + 1, 0))
+            while idx >= 0:
+                if token.startswith(s[idx:]):
+                    return s[idx:]
+                idx = s.find(token[0], idx + 1)
             return ""
 
         emitted_text_parts: list[str] = []
@@ -330,7 +406,7 @@ class MirothinkerToolParser(ToolParser):
                     emitted_text_parts.append(before)
                 chunk = chunk[start_idx + len(self.tool_call_start_token) :]
                 self._stream_mode = "tool"
-                self._tool_block_buffer = ""
+                self._tool_block_parts = []
                 self._tool_end_token_prefix = ""
                 continue
 
@@ -343,36 +419,37 @@ class MirothinkerToolParser(ToolParser):
             if end_idx < 0:
                 prefix = _longest_token_prefix_at_end(chunk, self.tool_call_end_token)
                 if prefix:
-                    self._tool_block_buffer += chunk[: -len(prefix)]
+                    if len(chunk) > len(prefix):
+                        self._tool_block_parts.append(chunk[: -len(prefix)])
                     self._tool_end_token_prefix = prefix
                 else:
-                    self._tool_block_buffer += chunk
+                    self._tool_block_parts.append(chunk)
                 break
 
             # Complete tool block
-            self._tool_block_buffer += chunk[:end_idx]
-            tool_block = (
-                self.tool_call_start_token
-                + self._tool_block_buffer
-                + self.tool_call_end_token
+            tool_block = "".join(
+                [
+                    self.tool_call_start_token,
+                    *self._tool_block_parts,
+                    chunk[:end_idx],
+                    self.tool_call_end_token,
+                ]
             )
             remainder = chunk[end_idx + len(self.tool_call_end_token) :]
 
             # Reset tool buffers before parsing
             self._stream_mode = "text"
-            self._tool_block_buffer = ""
+            self._tool_block_parts = []
             self._tool_end_token_prefix = ""
 
             try:
-                m = self._complete_tool_block_regex.search(tool_block)
-                if not m:
+                parsed = _parse_tool_block(tool_block)
+                if parsed is None:
                     emitted_text_parts.append(tool_block)
                     chunk = remainder
                     continue
 
-                server_name = (m.group(1) or "").strip()
-                tool_name = (m.group(2) or "").strip()
-                arguments_str = (m.group(3) or "").strip()
+                server_name, tool_name, arguments_str = parsed
 
                 if not tool_name:
                     emitted_text_parts.append(tool_block)
@@ -4,94 +4,170 @@ Test MiroThinkerToolParser for correctness.
 """
 
 import json
+import logging
 import sys
-from types import SimpleNamespace
-from unittest.mock import MagicMock
+from types import ModuleType, SimpleNamespace
 
+import pytest
 import regex as re
 
-# Mock vLLM imports for testing without vLLM installed
-# Create mock modules
-mock_vllm = MagicMock()
-mock_vllm.entrypoints = MagicMock()
-mock_vllm.entrypoints.chat_utils = MagicMock()
-mock_vllm.entrypoints.chat_utils.make_tool_call_id = lambda: "call_test_123"
-
-mock_protocol = SimpleNamespace(
-    ChatCompletionRequest=MagicMock,
-    DeltaFunctionCall=MagicMock,
-    DeltaMessage=MagicMock,
-    DeltaToolCall=MagicMock,
-    ExtractedToolCallInformation=MagicMock,
-    FunctionCall=MagicMock,
-    ToolCall=MagicMock,
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+# Stub the vLLM modules the parser imports, exposing only the names it uses,
+# so the tests run without vLLM installed
+def _stub(name, **attrs):
+    module = ModuleType(name)
+    module.__dict__.update(attrs)
+    sys.modules[name] = module
+    return module
+
+
+class _Model(SimpleNamespace):
+    def model_dump(self, exclude_none=False):
+        return {k: v for k, v in vars(self).items() if not (exclude_none and v is None)}
+
+
+class _ToolParser:
+    def __init__(self, tokenizer):
+        self.model_tokenizer = tokenizer
+
+
+_stub("vllm")
+_stub("vllm.entrypoints")
+_stub("vllm.entrypoints.chat_utils", make_tool_call_id=lambda: "call_test_123")
+_stub("vllm.entrypoints.openai")
+_stub(
+    "vllm.entrypoints.openai.protocol",
+    ChatCompletionRequest=SimpleNamespace,
+    DeltaFunctionCall=_Model,
+    DeltaMessage=SimpleNamespace,
+    DeltaToolCall=SimpleNamespace,
+    ExtractedToolCallInformation=SimpleNamespace,
+    FunctionCall=SimpleNamespace,
+    ToolCall=SimpleNamespace,
+)
+_stub("vllm.entrypoints.openai.tool_parsers")
+_stub(
+    "vllm.entrypoints.openai.tool_parsers.abstract_tool_parser",
+    ToolParser=_ToolParser,
+    ToolParserManager=SimpleNamespace(register_module=lambda *args: None),
 )
+_stub("vllm.logger", init_logger=logging.getLogger)
 
-mock_tool_parser = SimpleNamespace(
-    ToolParser=object,
-    ToolParserManager=MagicMock(),
+from MiroThinkerToolParser import (  # noqa: E402
+    MirothinkerToolParser,
+    _iter_tool_calls,
+    _parse_tool_block,
 )
 
-mock_logger = SimpleNamespace(
-    init_logger=lambda x: MagicMock(isEnabledFor=lambda _: False),
+_LOADS = orjson.loads if orjson else json.JSONDecoder().decode
+
+# Reference grammar for the MCP tool call format. The parser implements the
+# strict (_TOOL_CALL_RE) and lenient (_COMPLETE_TOOL_RE) forms with a
+# str.find scanner; test_scanner_matches_reference_regex keeps them in sync.
+_TOOL_CALL_RE = re.compile(
+    r"<use_mcp_tool>\s*+"
+    r"<server_name>\s*+((?:(?!</server_name>).)*?)\s*+</server_name>\s*+"
+    r"<tool_name>\s*+((?:(?!</tool_name>).)*?)\s*+</tool_name>\s*+"
+    r"<arguments>\s*+(.*?)\s*+</arguments>\s*+"
+    r"</use_mcp_tool>",
+    re.DOTALL | re.V1,
+)
+_PARTIAL_TOOL_RE = re.compile(
+    r"<use_mcp_tool>\s*+"
+    r"(?:<server_name>\s*+((?:(?!</server_name>).)*?)\s*+</server_name>\s*+)?"
+    r"(?:<tool_name>\s*+((?:(?!</tool_name>).)*?)\s*+</tool_name>\s*+)?"
+    r"(?:<arguments>(\s*.*))?",
+    re.DOTALL | re.V1,
+)
+_COMPLETE_TOOL_RE = re.compile(
+    r"<use_mcp_tool>\s*+"
+    r"(?:<server_name>\s*+((?:(?!</server_name>).)*?)\s*+</server_name>\s*+)?"
+    r"(?:<tool_name>\s*+((?:(?!</tool_name>).)*?)\s*+</tool_name>\s*+)?"
+    r"(?:<arguments>\s*+(.*?)\s*+(?:</arguments>\s*+)?)?"
+    r"</use_mcp_tool>",
+    re.DOTALL | re.V1,
 )
 
-sys.modules["vllm"] = mock_vllm
-sys.modules["vllm.entrypoints"] = mock_vllm.entrypoints
-sys.modules["vllm.entrypoints.chat_utils"] = mock_vllm.entrypoints.chat_utils
-sys.modules["vllm.entrypoints.openai"] = MagicMock()
-sys.modules["vllm.entrypoints.openai.protocol"] = mock_protocol
-sys.modules["vllm.entrypoints.openai.tool_parsers"] = MagicMock()
-sys.modules["vllm.entrypoints.openai.tool_parsers.abstract_tool_parser"] = (
-    mock_tool_parser
+# Well-formed tool call used by most tests; fill with .format(s=, t=, a=)
+_BASIC_CALL = (
+    "<use_mcp_tool>\n"
+    "<server_name>{s}</server_name>\n"
+    "<tool_name>{t}</tool_name>\n"
+    "<arguments>\n{a}\n</arguments>\n"
+    "</use_mcp_tool>"
 )
-sys.modules["vllm.logger"] = mock_logger
 
 
-def test_tool_call_regex():
+_TOOL_CALL_CASES = [
+    pytest.param(
+        _BASIC_CALL.format(s="my_mcp_server", t="web_search", a='{"query": "AI news"}'),
+        "my_mcp_server",
+        "web_search",
+        {"query": "AI news"},
+        id="basic",
+    ),
+    pytest.param(
+        "Let me search for that.\n\n"
+        + _BASIC_CALL.format(s="my_mcp_server", t="search", a='{"q": "test"}'),
+        "my_mcp_server",
+        "search",
+        {"q": "test"},
+        id="content-before",
+    ),
+    pytest.param(
+        _BASIC_CALL.format(
+            s="my_mcp_server",
+            t="complex_tool",
+            a="""{
+  "query": "test with quotes and apostrophes",
+  "options": {"nested": true},
+  "list": [1, 2, 3]
+}""",
+        ),
+        "my_mcp_server",
+        "complex_tool",
+        {
+            "query": "test with quotes and apostrophes",
+            "options": {"nested": True},
+            "list": [1, 2, 3],
+        },
+        id="complex-json",
+    ),
+    pytest.param(
+        _BASIC_CALL.format(s="my_mcp_server", t="no_args_tool", a="{}"),
+        "my_mcp_server",
+        "no_args_tool",
+        {},
+        id="empty-arguments",
+    ),
+    pytest.param(
+        "<use_mcp_tool><server_name>s</server_name><tool_name>t</tool_name><arguments>{}</arguments></use_mcp_tool>",
+        "s",
+        "t",
+        {},
+        id="minimal-whitespace",
+    ),
+]
+
+
+@pytest.mark.parametrize(("text", "server", "tool", "args"), _TOOL_CALL_CASES)
+def test_tool_call_regex(text, server, tool, args):
     """Test the main tool call regex pattern."""
-    tool_call_regex = re.compile(
-        r"<use_mcp_tool>\s*"
-        r"<server_name>(.*?)</server_name>\s*"
-        r"<tool_name>(.*?)</tool_name>\s*"
-        r"<arguments>\s*(.*?)\s*</arguments>\s*"
-        r"</use_mcp_tool>",
-        re.DOTALL,
-    )
-
-    # Test 1: Basic tool call
-    text1 = """<use_mcp_tool>
-<server_name>my_mcp_server</server_name>
-<tool_name>web_search</tool_name>
-<arguments>
-{"query": "AI news"}
-</arguments>
-</use_mcp_tool>"""
-
-    match = tool_call_regex.search(text1)
-    assert match is not None, "Should match basic tool call"
-    assert match.group(1).strip() == "my_mcp_server"
-    assert match.group(2).strip() == "web_search"
-    assert json.loads(match.group(3).strip()) == {"query": "AI news"}
-    print("✅ Test 1: Basic tool call - PASSED")
+    match = _TOOL_CALL_RE.search(text)
+    assert match is not None, "Should match tool call"
+    assert match.group(1) == server
+    assert match.group(2) == tool
+    assert _LOADS(match.group(3)) == args
 
-    # Test 2: Tool call with content before
-    text2 = """Let me search for that.
 
-<use_mcp_tool>
-<server_name>my_mcp_server</server_name>
-<tool_name>search</tool_name>
-<arguments>
-{"q": "test"}
-</arguments>
-</use_mcp_tool>"""
-
-    match = tool_call_regex.search(text2)
-    assert match is not None, "Should match tool call with content before"
-    print("✅ Test 2: Tool call with content before - PASSED")
-
-    # Test 3: Multiple tool calls
-    text3 = """<use_mcp_tool>
+def test_multiple_tool_calls():
+    """Test that every tool call in a response is found."""
+    text = """<use_mcp_tool>
 <server_name>server1</server_name>
 <tool_name>tool1</tool_name>
 <arguments>{"a": 1}</arguments>
@@ -103,76 +179,25 @@ def test_tool_call_regex():
 <arguments>{"b": 2}</arguments>
 </use_mcp_tool>"""
 
-    matches = list(tool_call_regex.finditer(text3))
+    matches = list(_TOOL_CALL_RE.finditer(text))
     assert len(matches) == 2, f"Should find 2 tool calls, found {len(matches)}"
-    assert matches[0].group(2).strip() == "tool1"
-    assert matches[1].group(2).strip() == "tool2"
-    print("✅ Test 3: Multiple tool calls - PASSED")
-
-    # Test 4: Complex JSON arguments
-    text4 = """<use_mcp_tool>
-<server_name>my_mcp_server</server_name>
-<tool_name>complex_tool</tool_name>
-<arguments>
-{
-  "query": "test with quotes and apostrophes",
-  "options": {"nested": true},
-  "list": [1, 2, 3]
-}
-</arguments>
-</use_mcp_tool>"""
-
-    match = tool_call_regex.search(text4)
-    assert match is not None, "Should match complex JSON"
-    args = json.loads(match.group(3).strip())
-    assert args["query"] == "test with quotes and apostrophes"
-    assert args["options"]["nested"] is True
-    print("✅ Test 4: Complex JSON arguments - PASSED")
-
-    # Test 5: Empty arguments
-    text5 = """<use_mcp_tool>
-<server_name>my_mcp_server</server_name>
-<tool_name>no_args_tool</tool_name>
-<arguments>
-{}
-</arguments>
-</use_mcp_tool>"""
-
-    match = tool_call_regex.search(text5)
-    assert match is not None, "Should match empty arguments"
-    assert json.loads(match.group(3).strip()) == {}
-    print("✅ Test 5: Empty arguments - PASSED")
-
-    # Test 6: Minimal whitespace
-    text6 = "<use_mcp_tool><server_name>s</server_name><tool_name>t</tool_name><arguments>{}</arguments></use_mcp_tool>"
-    match = tool_call_regex.search(text6)
-    assert match is not None, "Should match minimal whitespace"
-    print("✅ Test 6: Minimal whitespace - PASSED")
+    assert matches[0].group(2) == "tool1"
+    assert matches[1].group(2) == "tool2"
 
 
 def test_partial_tool_regex():
     """Test the partial tool regex for streaming."""
-    partial_tool_regex = re.compile(
-        r"<use_mcp_tool>\s*"
-        r"(?:<server_name>(.*?)</server_name>\s*)?"
-        r"(?:<tool_name>(.*?)</tool_name>\s*)?"
-        r"(?:<arguments>(\s*.*))?",
-        re.DOTALL,
-    )
-
     # Test partial: only opening tag
     text1 = "<use_mcp_tool>\n"
-    match = partial_tool_regex.search(text1)
+    match = _PARTIAL_TOOL_RE.search(text1)
     assert match is not None
-    print("✅ Partial test 1: Only opening tag - PASSED")
 
     # Test partial: server_name only
     text2 = "<use_mcp_tool>\n<server_name>my_server</server_name>\n"
-    match = partial_tool_regex.search(text2)
+    match = _PARTIAL_TOOL_RE.search(text2)
     assert match is not None
-    assert match.group(1).strip() == "my_server"
+    assert match.group(1) == "my_server"
     assert match.group(2) is None
-    print("✅ Partial test 2: Server name only - PASSED")
 
     # Test partial: incomplete arguments
     text3 = """<use_mcp_tool>
@@ -181,40 +206,23 @@ def test_partial_tool_regex():
 <arguments>
 {"query": "incomp"""
 
-    match = partial_tool_regex.search(text3)
+    match = _PARTIAL_TOOL_RE.search(text3)
     assert match is not None
-    assert match.group(1).strip() == "my_server"
-    assert match.group(2).strip() == "my_tool"
+    assert match.group(1) == "my_server"
+    assert match.group(2) == "my_tool"
     assert '{"query": "incomp' in match.group(3)
-    print("✅ Partial test 3: Incomplete arguments - PASSED")
 
 
 def test_complete_tool_block_regex():
     """Test the complete tool block regex used in streaming."""
-    complete_regex = re.compile(
-        r"<use_mcp_tool>\s*"
-        r"(?:<server_name>(.*?)</server_name>\s*)?"
-        r"(?:<tool_name>(.*?)</tool_name>\s*)?"
-        r"(?:<arguments>\s*(.*?)\s*(?:</arguments>\s*)?)?"
-        r"</use_mcp_tool>",
-        re.DOTALL,
-    )
-
     # Test: Complete block
-    text1 = """<use_mcp_tool>
-<server_name>my_mcp_server</server_name>
-<tool_name>search</tool_name>
-<arguments>
-{"q": "test"}
-</arguments>
-</use_mcp_tool>"""
+    text1 = _BASIC_CALL.format(s="my_mcp_server", t="search", a='{"q": "test"}')
 
-    match = complete_regex.search(text1)
+    match = _COMPLETE_TOOL_RE.match(text1)
     assert match is not None
-    assert match.group(1).strip() == "my_mcp_server"
-    assert match.group(2).strip() == "search"
-    assert json.loads(match.group(3).strip()) == {"q": "test"}
-    print("✅ Complete block test 1: Full block - PASSED")
+    assert match.group(1) == "my_mcp_server"
+    assert match.group(2) == "search"
+    assert _LOADS(match.group(3)) == {"q": "test"}
 
     # Test: Without arguments tag
     text2 = """<use_mcp_tool>
@@ -222,70 +230,165 @@ def test_complete_tool_block_regex():
 <tool_name>simple_tool</tool_name>
 </use_mcp_tool>"""
 
-    match = complete_regex.search(text2)
+    match = _COMPLETE_TOOL_RE.match(text2)
     assert match is not None
-    assert match.group(2).strip() == "simple_tool"
+    assert match.group(2) == "simple_tool"
     assert match.group(3) is None
-    print("✅ Complete block test 2: Without arguments - PASSED")
 
 
 def test_edge_cases():
     """Test edge cases and potential bugs."""
-    tool_call_regex = re.compile(
-        r"<use_mcp_tool>\s*"
-        r"<server_name>(.*?)</server_name>\s*"
-        r"<tool_name>(.*?)</tool_name>\s*"
-        r"<arguments>\s*(.*?)\s*</arguments>\s*"
-        r"</use_mcp_tool>",
-        re.DOTALL,
-    )
-
     # Edge case 1: Unicode in arguments
-    text1 = """<use_mcp_tool>
-<server_name>my_mcp_server</server_name>
-<tool_name>search</tool_name>
-<arguments>
-{"query": "你好世界 🎉"}
-</arguments>
-</use_mcp_tool>"""
+    text1 = _BASIC_CALL.format(
+        s="my_mcp_server", t="search", a='{"query": "你好世界 🎉"}'
+    )
 
-    match = tool_call_regex.search(text1)
+    match = _TOOL_CALL_RE.search(text1)
     assert match is not None
-    args = json.loads(match.group(3).strip())
+    args = _LOADS(match.group(3))
     assert args["query"] == "你好世界 🎉"
-    print("✅ Edge case 1: Unicode in arguments - PASSED")
 
     # Edge case 2: Newlines in JSON
-    text2 = """<use_mcp_tool>
-<server_name>my_mcp_server</server_name>
-<tool_name>search</tool_name>
-<arguments>
-{
+    text2 = _BASIC_CALL.format(
+        s="my_mcp_server",
+        t="search",
+        a="""{
   "query": "line1\\nline2\\nline3"
-}
-</arguments>
-</use_mcp_tool>"""
+}""",
+    )
 
-    match = tool_call_regex.search(text2)
+    match = _TOOL_CALL_RE.search(text2)
     assert match is not None
-    args = json.loads(match.group(3).strip())
+    args = _LOADS(match.group(3))
     assert "line1\nline2" in args["query"]
-    print("✅ Edge case 2: Newlines in JSON - PASSED")
 
     # Edge case 3: Tags in content (should not match nested)
-    text3 = """<use_mcp_tool>
-<server_name>my_mcp_server</server_name>
-<tool_name>search</tool_name>
-<arguments>
-{"query": "<html><body>test</body></html>"}
-</arguments>
-</use_mcp_tool>"""
+    text3 = _BASIC_CALL.format(
+        s="my_mcp_server",
+        t="search",
+        a='{"query": "<html><body>test</body></html>"}',
+    )
 
-    match = tool_call_regex.search(text3)
+    match = _TOOL_CALL_RE.search(text3)
     assert match is not None
-    args = json.loads(match.group(3).strip())
+    args = _LOADS(match.group(3))
     assert "<html>" in args["query"]
-    print("✅ Edge case 3: HTML tags in arguments - PASSED")
+
+
+def test_scanner_matches_reference_regex():
+    """The parser's scanner should agree with the reference patterns."""
+    texts = [
+        "<use_mcp_tool>\n<server_name> s </server_name>\n<tool_name>t</tool_name>\n"
+        '<arguments>\n{"a": "</arguments>"}\n</arguments>\n</use_mcp_tool>',
+        "Intro <use_mcp_tool><server_name>a<b</server_name></use_mcp_tool>"
+        "<use_mcp_tool><server_name>s</server_name><tool_name>t</tool_name>"
+        "<arguments>{}</arguments></use_mcp_tool> tail",
+        "<use_mcp_tool>\n<tool_name>only_tool</tool_name>\n</use_mcp_tool>",
+        "<use_mcp_tool><server_name>s</server_name><tool_name>t</tool_name>"
+        "<arguments>\n{}\n</use_mcp_tool>",
+        "<use_mcp_tool>garbage</use_mcp_tool>",
+        "<use_mcp_tool>\n<use_mcp_tool><tool_name>t</tool_name></use_mcp_tool>",
+        "<use_mcp_tool><server_name>a<b</server_name><tool_name><t>x</tool_name>"
+        '<arguments>{"q": "a<b"}</arguments></use_mcp_tool>',
+        "<use_mcp_tool><server_name>s</server_name><tool_name>t<</tool_name>"
+        "</use_mcp_tool>",
+    ]
+    for text in texts:
+        expected = [m.groups() for m in _TOOL_CALL_RE.finditer(text)]
+        assert list(_iter_tool_calls(text)) == expected
+
+        block = text[text.find("<use_mcp_tool>") :]
+        block = block[: block.find("</use_mcp_tool>") + len("</use_mcp_tool>")]
+        match = _COMPLETE_TOOL_RE.search(block)
+        expected = match and tuple(g or "" for g in match.groups())
+        assert _parse_tool_block(block) == expected
+
+
+def test_scanner_allows_lt_in_tag_values():
+    """Server and tool names may contain '<', as with the original regex."""
+    text = _BASIC_CALL.format(s="a<b", t="x<y>z", a='{"q": "1 < 2"}')
+    assert list(_iter_tool_calls(text)) == [("a<b", "x<y>z", '{"q": "1 < 2"}')]
+    block = "<use_mcp_tool><server_name>a<b</server_name></use_mcp_tool>"
+    assert _parse_tool_block(block) == ("a<b", "", "")
+
+
+_STREAM_REQUEST = SimpleNamespace(
+    tools=[
+        SimpleNamespace(function=SimpleNamespace(name="web_search")),
+        SimpleNamespace(function=SimpleNamespace(name="fetch_url")),
+    ],
+    tool_choice="auto",
+)
+
+# (model output, streamed content, streamed (index, name, arguments) calls);
+# the expected values are what the original regex-based parser produced
+_STREAM_CASES = [
+    pytest.param(
+        "Let me search. "
+        + _BASIC_CALL.format(
+            s="my_mcp_server", t="web_search", a='{"query": "AI </use news"}'
+        )
+        + " done <use",
+        "Let me search.  done ",
+        [(0, "web_search", '{"query": "AI </use news"}')],
+        id="text-around-call",
+    ),
+    pytest.param(
+        _BASIC_CALL.format(s="my_mcp_server", t="web_search", a='{"x": 1}')
+        + "\n"
+        + _BASIC_CALL.format(s="my_mcp_server", t="fetch_url", a='{"y": [1, 2]}'),
+        "\n",
+        [(0, "web_search", '{"x": 1}'), (1, "fetch_url", '{"y": [1, 2]}')],
+        id="two-calls",
+    ),
+    pytest.param(
+        "x <use_mcp_tool><server_name>s</server_name></use_mcp_tool> y <use_mcp_tool y",
+        "x <use_mcp_tool><server_name>s</server_name></use_mcp_tool> y <use_mcp_tool y",
+        [],
+        id="no-tool-name",
+    ),
+    pytest.param(
+        "<use_mcp_tool><tool_name>t</tool_name><arguments>{'a': 1,</use_mcp_tool><</",
+        "<</",
+        [(0, "t", '{"a": 1}')],
+        id="repaired-arguments",
+    ),
+]
+
+
+def _stream(deltas):
+    """Feed deltas to a fresh parser; return (content, tool calls)."""
+    parser = MirothinkerToolParser(None)
+    previous = ""
+    content = []
+    calls = []
+    for delta in deltas:
+        message = parser.extract_tool_calls_streaming(
+            previous, previous + delta, delta, [], [], [], _STREAM_REQUEST
+        )
+        previous += delta
+        if message is None:
+            continue
+        if message.content:
+            content.append(message.content)
+        for call in getattr(message, "tool_calls", None) or []:
+            calls.append(
+                (call.index, call.function["name"], call.function["arguments"])
+            )
+    return "".join(content), calls
+
+
+@pytest.mark.parametrize(("text", "content", "calls"), _STREAM_CASES)
+def test_streaming_split_at_every_offset(text, content, calls):
+    """Splitting the output into two deltas anywhere gives the same result."""
+    for i in range(len(text) + 1):
+        assert _stream([text[:i], text[i:]]) == (content, calls), i
+
+
+@pytest.mark.parametrize(("text", "content", "calls"), _STREAM_CASES)
+def test_streaming_one_char_per_delta(text, content, calls):
+    """Streaming one character at a time gives the same result."""
+    assert _stream(list(text)) == (content, calls)
 
 
 def check_unused_code():
@@ -311,10 +414,7 @@ def check_unused_code():
     # Issue 2: Unused method
     issues.append("⚠️  `_ensure_tool_id_valid` method is defined but never called")
 
-    # Issue 3: Unused regex
-    issues.append("⚠️  `partial_tool_regex` is defined but never used")
-
-    # Issue 4: server_name handling
+    # Issue 3: server_name handling
     issues.append(
         "⚠️  `_resolve_tool_name` checks for 'default' server_name,\n   but chat_template.jinja uses 'my_mcp_server'"
     )
@@ -327,10 +427,9 @@ def check_unused_code():
     print("=" * 60)
     print("""
 1. Remove unused variables and methods to clean up the code
-2. Either use `partial_tool_regex` or remove it
-3. Update `_resolve_tool_name` to handle 'my_mcp_server' correctly
-4. The streaming implementation looks correct with the state machine approach
-5. The main `extract_tool_calls` and `extract_tool_calls_streaming` logic appears sound
+2. Update `_resolve_tool_name` to handle 'my_mcp_server' correctly
+3. The streaming implementation looks correct with the state machine approach
+4. The main `extract_tool_calls` and `extract_tool_calls_streaming` logic appears sound
 """)
 
 
@@ -340,7 +439,9 @@ def main():
     print("=" * 60)
 
     print("\n--- Testing Main Tool Call Regex ---")
-    test_tool_call_regex()
+    for case in _TOOL_CALL_CASES:
+        test_tool_call_regex(*case.values)
+    test_multiple_tool_calls()
 
     print("\n--- Testing Partial Tool Regex ---")
     test_partial_tool_regex()
@@ -351,6 +452,15 @@ def main():
     print("\n--- Testing Edge Cases ---")
     test_edge_cases()
 
+    print("\n--- Testing Parser Scanner ---")
+    test_scanner_matches_reference_regex()
+    test_scanner_allows_lt_in_tag_values()
+
+    print("\n--- Testing Streaming ---")
+    for case in _STREAM_CASES:
+        test_streaming_split_at_every_offset(*case.values)
+        test_streaming_one_char_per_delta(*case.values)
+
     check_unused_code()
 
     print("\n" + "=" * 60)
@@ -5,10 +5,19 @@ import argparse
 import glob
 import json
 import os
-from pathlib import Path
+import re
+from concurrent.futures import ThreadPoolExecutor
 
+import numpy as np
 from common import ProgressChecker
 
+try:
+    import orjson
+except ImportError:  # orjson is optional, fall back to the stdlib codec
+    orjson = None
+
+_loads = orjson.loads if orjson else json.loads
+
 # Benchmark configuration
 FILENAME = os.path.basename(__file__)
 BENCHMARK_NAME = "deepsearchqa"
@@ -16,6 +25,32 @@ BENCHMARK_NAME_STD = "DeepSearchQA"
 TASKS_PER_RUN = 900
 DATA_PATH = f"../../data/{BENCHMARK_NAME}/standardized_data.jsonl"
 TASK_ID_PATTERN = r"task_([a-f0-9]+)"
+# Reading task logs is I/O-bound, so use more threads than cores
+LOG_READ_WORKERS = min(32, (os.cpu_count() or 4) * 4)
+# Judge summary printed by the DeepSearchQA evaluator: "Correct: X/Y, Excessive: Z"
+JUDGE_MARKER = b"DeepSearchQA Judge - Correct:"
+JUDGE_RESULT_RE = re.compile(
+    r"DeepSearchQA Judge - Correct:\s*(\d+)/(\d+),\s*Excessive:\s*(\d+)"
+)
+
+
+def parse_judge_output(text: str) -> dict:
+    """
+    Parse the DeepSearchQA judge summary line out of logged output.
+
+    Returns:
+        Dict with num_correct, num_expected, num_excessive, or empty dict if not found
+    """
+    match = JUDGE_RESULT_RE.search(text)
+    if not match:
+        return {}
+
+    num_correct, num_expected, num_excessive = map(int, match.groups())
+    return {
+        "num_correct": num_correct,
+        "num_expected": num_expected,
+        "num_excessive": num_excessive,
+    }
 
 
 def extract_eval_details_from_log(log_file: str) -> dict:
@@ -26,12 +61,17 @@ def extract_eval_details_from_log(log_file: str) -> dict:
         Dict with num_correct, num_expected, num_excessive, or empty dict if not found
     """
     try:
-        with open(log_file, "r") as f:
+        # Both parsers accept bytes, so skip decoding the file up front
+        with open(log_file, "rb") as f:
             content = f.read()
 
+        # Logs of unevaluated tasks carry neither marker, so skip parsing them
+        if b'"eval_details"' not in content and JUDGE_MARKER not in content:
+            return {}
+
         # Try to parse as JSON first (task log files are JSON)
         try:
-            log_data = json.loads(content)
+            log_data = _loads(content)
 
             # Method 1: Check for eval_details field (new format - saved directly)
             if "eval_details" in log_data and log_data["eval_details"]:
@@ -48,47 +88,91 @@ def extract_eval_details_from_log(log_file: str) -> dict:
 
             # Method 2: Check if llm_response contains the evaluation output (legacy format)
             if "llm_response" in log_data and log_data["llm_response"]:
-                llm_response = log_data["llm_response"]
-
-                # Look for DeepSearchQA Judge output
-                if "DeepSearchQA Judge - Correct:" in llm_response:
-                    for line in llm_response.split("\n"):
-                        if "DeepSearchQA Judge - Correct:" in line:
-                            # Parse "Correct: X/Y, Excessive: Z"
-                            parts = line.split("Correct:")[1].strip()
-                            correct_part, excessive_part = parts.split(", Excessive:")
-                            num_correct, num_expected = map(
-                                int, correct_part.split("/")
-                            )
-                            num_excessive = int(excessive_part.strip())
-
-                            return {
-                                "num_correct": num_correct,
-                                "num_expected": num_expected,
-                                "num_excessive": num_excessive,
-                            }
+                return parse_judge_output(log_data["llm_response"])
         except json.JSONDecodeError:
             # Not JSON, try as plain text (legacy format)
-            if "DeepSearchQA Judge - Correct:" in content:
-                for line in content.split("\n"):
-                    if "DeepSearchQA Judge - Correct:" in line:
-                        # Parse "Correct: X/Y, Excessive: Z"
-                        parts = line.split("Correct:")[1].strip()
-                        correct_part, excessive_part = parts.split(", Excessive:")
-                        num_correct, num_expected = map(int, correct_part.split("/"))
-                        num_excessive = int(excessive_part.strip())
-
-                        return {
-                            "num_correct": num_correct,
-                            "num_expected": num_expected,
-                            "num_excessive": num_excessive,
-                        }
+            return parse_judge_output(content.decode())
     except Exception:
         pass
 
     return {}
 
 
+def summarize_eval_details(num_correct, num_expected, num_excessive) -> dict:
+    """
+    Calculate the DeepSearchQA metrics from per-item judge counts.
+
+    Args:
+        num_correct, num_expected, num_excessive: Equal-length sequences with
+            one entry per evaluated item
+
+    Returns:
+        Dict with the category counts and percentages and the average F1
+    """
+    # Calculate per-item metrics
+    true_positives = np.asarray(num_correct, dtype=np.int64)
+    num_expected = np.asarray(num_expected, dtype=np.int64)
+    false_negatives = num_expected - true_positives
+    false_positives = np.asarray(num_excessive, dtype=np.int64)
+    num_valid = len(true_positives)
+
+    # Calculate precision and recall for F1 (0 where the denominator is 0)
+    predicted = true_positives + false_positives
+    precision = np.divide(
+        true_positives, predicted, out=np.zeros(num_valid), where=predicted > 0
+    )
+    relevant = true_positives + false_negatives
+    recall = np.divide(
+        true_positives, relevant, out=np.zeros(num_valid), where=relevant > 0
+    )
+    precision_plus_recall = precision + recall
+    f1 = np.divide(
+        2 * precision * recall,
+        precision_plus_recall,
+        out=np.zeros(num_valid),
+        where=precision_plus_recall > 0,
+    )
+
+    # Classify into categories
+    all_expected_correct = true_positives == num_expected
+    has_extraneous = false_positives > 0
+    fully_correct = all_expected_correct & ~has_extraneous
+    num_fully_correct = int(fully_correct.sum())
+    num_fully_incorrect = int((~fully_correct & (true_positives == 0)).sum())
+    num_correct_with_extraneous = int(
+        (all_expected_correct & has_extraneous & (true_positives != 0)).sum()
+    )
+
+    return {
+        "num_valid": num_valid,
+        "fully_correct": num_fully_correct,
+        "fully_incorrect": num_fully_incorrect,
+        "correct_with_extraneous": num_correct_with_extraneous,
+        "pct_fully_correct": num_fully_correct / num_valid,
+        "pct_fully_incorrect": num_fully_incorrect / num_valid,
+        "pct_correct_with_extraneous": num_correct_with_extraneous / num_valid,
+        "avg_f1": float(f1.mean()),
+    }
+
+
+def iter_task_logs(base_path: str):
+    """
+    Yield the task log files (run_*/task_*.json) under base_path.
+
+    Walks the two directory levels with os.scandir, so entries are filtered on
+    their names and cached types and files are yielded as they are found.
+    """
+    with os.scandir(base_path) as runs:
+        for run in runs:
+            if not run.name.startswith("run_") or not run.is_dir():
+                continue
+            with os.scandir(run.path) as entries:
+                for entry in entries:
+                    name = entry.name
+                    if name.startswith("task_") and name.endswith(".json"):
+                        yield entry.path
+
+
 def calculate_deepsearchqa_metrics_from_logs(base_path: str) -> dict:
     """
     Calculate metrics from individual task log files (for in-progress runs).
@@ -97,72 +181,25 @@ def calculate_deepsearchqa_metrics_from_logs(base_path: str) -> dict:
         Dict with metrics or None if no completed tasks found
     """
     try:
-        # Find all completed task log files
-        pattern = os.path.join(base_path, "run_*/task_*.json")
-        log_files = glob.glob(pattern)
-
-        if not log_files:
-            return None
-
-        num_valid = 0
-        num_fully_correct = 0
-        num_fully_incorrect = 0
-        num_correct_with_extraneous = 0
-        f1_list = []
-
-        for log_file in log_files:
-            details = extract_eval_details_from_log(log_file)
-            if not details:
-                continue
-
-            num_correct = details["num_correct"]
-            num_expected = details["num_expected"]
-            num_excessive = details["num_excessive"]
-
-            # Calculate per-item metrics
-            true_positives = num_correct
-            false_negatives = num_expected - num_correct
-            false_positives = num_excessive
-
-            # Calculate precision and recall for F1
-            precision = 0.0
-            if (true_positives + false_positives) > 0:
-                precision = true_positives / (true_positives + false_positives)
-
-            recall = 0.0
-            if (true_positives + false_negatives) > 0:
-                recall = true_positives / (true_positives + false_negatives)
-
-            f1 = 0.0
-            if (precision + recall) > 0:
-                f1 = 2 * (precision * recall) / (precision + recall)
-
-            f1_list.append(f1)
-
-            # Classify into categories
-            all_expected_correct = num_correct == num_expected
-            has_extraneous = num_excessive > 0
-
-            if all_expected_correct and not has_extraneous:
-                num_fully_correct += 1
-            elif num_correct == 0:
-                num_fully_incorrect += 1
-            elif all_expected_correct and has_extraneous:
-                num_correct_with_extraneous += 1
-
-            num_valid += 1
-
-        if num_valid > 0:
-            return {
-                "num_valid": num_valid,
-                "fully_correct": num_fully_correct,
-                "fully_incorrect": num_fully_incorrect,
-                "correct_with_extraneous": num_correct_with_extraneous,
-                "pct_fully_correct": num_fully_correct / num_valid,
-                "pct_fully_incorrect": num_fully_incorrect / num_valid,
-                "pct_correct_with_extraneous": num_correct_with_extraneous / num_valid,
-                "avg_f1": sum(f1_list) / len(f1_list),
-            }
+        num_correct = []
+        num_expected = []
+        num_excessive = []
+
+        # Each log is read independently; threads overlap the file reads
+        # without the start-up and pickling cost of a process pool
+        with ThreadPoolExecutor(max_workers=LOG_READ_WORKERS) as executor:
+            for details in executor.map(
+                extract_eval_details_from_log, iter_task_logs(base_path)
+            ):
+                if not details:
+                    continue
+
+                num_correct.append(details["num_correct"])
+                num_expected.append(details["num_expected"])
+                num_excessive.append(details["num_excessive"])
+
+        if num_correct:
+            return summarize_eval_details(num_correct, num_expected, num_excessive)
 
         return None
 
@@ -183,78 +220,38 @@ def calculate_deepsearchqa_metrics(results_file: str) -> dict:
         Dict with the 4 core metrics
     """
     try:
-        results = []
-        with open(results_file, "r") as f:
-            for line in f:
-                if line.strip():
-                    results.append(json.loads(line))
+        num_correct = []
+        num_expected = []
+        num_excessive = []
 
-        num_valid = 0
-        num_fully_correct = 0
-        num_fully_incorrect = 0
-        num_correct_with_extraneous = 0
-        f1_list = []
+        # Decode one line at a time, keeping only the counts of each result
+        with open(results_file, "rb") as f:
+            for line in f:
+                if not line.strip():
+                    continue
+
+                result = _loads(line)
+                if result.get("status") != "success":
+                    continue
+
+                # Extract eval_details from the first attempt that has them
+                details = next(
+                    (
+                        attempt["eval_details"]
+                        for attempt in result.get("attempts") or ()
+                        if attempt.get("eval_details")
+                    ),
+                    None,
+                )
+                if details is None:
+                    continue
 
-        for result in results:
-            if result.get("status") != "success":
-                continue
+                num_correct.append(details.get("num_correct", 0))
+                num_expected.append(details.get("num_expected", 0))
+                num_excessive.append(details.get("num_excessive", 0))
 
-            # Extract eval_details from attempts
-            if "attempts" in result and result["attempts"]:
-                for attempt in result["attempts"]:
-                    if "eval_details" in attempt and attempt["eval_details"]:
-                        details = attempt["eval_details"]
-                        num_correct = details.get("num_correct", 0)
-                        num_expected = details.get("num_expected", 0)
-                        num_excessive = details.get("num_excessive", 0)
-
-                        # Calculate per-item metrics
-                        true_positives = num_correct
-                        false_negatives = num_expected - num_correct
-                        false_positives = num_excessive
-
-                        # Calculate precision and recall for F1
-                        precision = 0.0
-                        if (true_positives + false_positives) > 0:
-                            precision = true_positives / (
-                                true_positives + false_positives
-                            )
-
-                        recall = 0.0
-                        if (true_positives + false_negatives) > 0:
-                            recall = true_positives / (true_positives + false_negatives)
-
-                        f1 = 0.0
-                        if (precision + recall) > 0:
-                            f1 = 2 * (precision * recall) / (precision + recall)
-
-                        f1_list.append(f1)
-
-                        # Classify into categories
-                        all_expected_correct = num_correct == num_expected
-                        has_extraneous = num_excessive > 0
-
-                        if all_expected_correct and not has_extraneous:
-                            num_fully_correct += 1
-                        elif num_correct == 0:
-                            num_fully_incorrect += 1
-                        elif all_expected_correct and has_extraneous:
-                            num_correct_with_extraneous += 1
-
-                        num_valid += 1
-                        break  # Only use first attempt with details
-
-        if num_valid > 0:
-            return {
-                "num_valid": num_valid,
-                "fully_correct": num_fully_correct,
-                "fully_incorrect": num_fully_incorrect,
-                "correct_with_extraneous": num_correct_with_extraneous,
-                "pct_fully_correct": num_fully_correct / num_valid,
-                "pct_fully_incorrect": num_fully_incorrect / num_valid,
-                "pct_correct_with_extraneous": num_correct_with_extraneous / num_valid,
-                "avg_f1": sum(f1_list) / len(f1_list),
-            }
+        if num_correct:
+            return summarize_eval_details(num_correct, num_expected, num_excessive)
         else:
             return {"num_valid": 0}
 
@@ -277,7 +274,7 @@ def show_deepsearchqa_metrics(base_path: str):
     print("=" * 80)
 
     # Find all benchmark_results.jsonl files
-    results_files = glob.glob(os.path.join(base_path, "run_*/benchmark_results.jsonl"))
+    results_files = glob.glob(f"{base_path}/run_*/benchmark_results.jsonl")
 
     if not results_files:
         print("(Metrics will be available after tasks complete)")
@@ -289,7 +286,7 @@ def show_deepsearchqa_metrics(base_path: str):
     all_f1 = []
 
     for results_file in sorted(results_files):
-        run_dir = Path(results_file).parent.name
+        run_dir = os.path.basename(os.path.dirname(results_file))
         metrics = calculate_deepsearchqa_metrics(results_file)
 
         if metrics["num_valid"] > 0:
@@ -319,12 +316,21 @@ def show_deepsearchqa_metrics(base_path: str):
         print("\n" + "=" * 80)
         print(f"Average across {len(all_fully_correct)} runs:")
         print("=" * 80)
-        avg_fully_correct = sum(all_fully_correct) / len(all_fully_correct)
-        avg_fully_incorrect = sum(all_fully_incorrect) / len(all_fully_incorrect)
-        avg_correct_with_extraneous = sum(all_correct_with_extraneous) / len(
-            all_correct_with_extraneous
+        # One (metric, run) array, averaged over the runs in a single call
+        (
+            avg_fully_correct,
+            avg_fully_incorrect,
+            avg_correct_with_extraneous,
+            avg_f1,
+        ) = np.mean(
+            [
+                all_fully_correct,
+                all_fully_incorrect,
+                all_correct_with_extraneous,
+                all_f1,
+            ],
+            axis=1,
         )
-        avg_f1 = sum(all_f1) / len(all_f1)
 
         print(f"  Fully Correct:              {avg_fully_correct:6.2%}")
         print(f"  Fully Incorrect:            {avg_fully_incorrect:6.2%}")
@@ -358,13 +364,12 @@ if __name__ == "__main__":
 
         # Show DeepSearchQA-specific metrics (only if runs are complete)
         # Check if any run has completed all its tasks
-        has_complete_run = False
-        run_dirs = glob.glob(os.path.join(args.path, "run_*"))
-        for run_dir in run_dirs:
-            results_file = os.path.join(run_dir, "benchmark_results.jsonl")
-            if os.path.exists(results_file):
-                has_complete_run = True
-                break
+        with os.scandir(args.path) as entries:
+            has_complete_run = any(
+                os.path.isfile(f"{entry.path}/benchmark_results.jsonl")
+                for entry in entries
+                if entry.name.startswith("run_") and entry.is_dir()
+            )
 
         if has_complete_run:
             show_deepsearchqa_metrics(args.path)
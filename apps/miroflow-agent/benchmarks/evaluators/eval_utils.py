@@ -2,25 +2,204 @@
 # This source code is licensed under the Apache 2.0 License.
 
 import asyncio
+import functools
+import hashlib
 import json
+import logging
 import os
 import re
 import string
 import warnings
+from collections import OrderedDict
 from typing import Any, Dict, Literal, Optional
 
+import httpx
 from dotenv import load_dotenv
-from openai import AsyncOpenAI, OpenAI
+from openai import (
+    APIConnectionError,
+    APITimeoutError,
+    AsyncOpenAI,
+    DefaultAsyncHttpxClient,
+    InternalServerError,
+    OpenAI,
+    RateLimitError,
+    pydantic_function_tool,
+)
 from pydantic import BaseModel
+from tenacity import (
+    retry,
+    retry_if_exception_type,
+    stop_after_attempt,
+    wait_exponential_jitter,
+)
 
 load_dotenv()
 
+logger = logging.getLogger(__name__)
+
 OPENAI_API_KEY = os.environ.get("OPENAI_API_KEY")
 OPENAI_BASE_URL = os.environ.get("OPENAI_BASE_URL")
 
-evaluation_llm_client = AsyncOpenAI(api_key=OPENAI_API_KEY, base_url=OPENAI_BASE_URL)
+# common_benchmark.py judges one answer at a time in each worker process, so
+# a few kept-alive connections per process are all the judge client needs
+JUDGE_HTTP_LIMITS = httpx.Limits(max_connections=4, max_keepalive_connections=4)
+
+evaluation_llm_client = AsyncOpenAI(
+    api_key=OPENAI_API_KEY,
+    base_url=OPENAI_BASE_URL,
+    http_client=DefaultAsyncHttpxClient(limits=JUDGE_HTTP_LIMITS),
+)
 model_as_a_judge_client = OpenAI(api_key=OPENAI_API_KEY, base_url=OPENAI_BASE_URL)
 
+# Definitive verdicts of the LLM judges, keyed on (judge, digest of its inputs).
+# Repeated evaluations of the same answer (pass@k attempts, retries, re-runs in
+# one process) then skip the API round-trip. Least recently used entries are
+# evicted past _JUDGE_CACHE_SIZE.
+_JUDGE_CACHE_SIZE = 4096
+_JUDGE_CACHE: OrderedDict[tuple[str, str], str] = OrderedDict()
+
+# Judge calls in progress, so concurrent identical evaluations share one call
+_JUDGE_IN_FLIGHT: dict[tuple[str, str], asyncio.Future] = {}
+
+
+def _cache_verdicts(verify_fn):
+    """Memoize an async judge's CORRECT/INCORRECT verdicts per input triple."""
+
+    @functools.wraps(verify_fn)
+    async def wrapper(question: str, target: str, predicted_answer: str) -> str:
+        digest = hashlib.blake2b(
+            repr((question, target, predicted_answer)).encode(), digest_size=16
+        ).hexdigest()
+        key = (verify_fn.__name__, digest)
+        verdict = _JUDGE_CACHE.get(key)
+        if verdict is not None:
+            _JUDGE_CACHE.move_to_end(key)
+            return verdict
+
+        in_flight = _JUDGE_IN_FLIGHT.get(key)
+        if in_flight is not None:
+            # Shielded so a cancelled waiter does not cancel the shared call
+            return await asyncio.shield(in_flight)
+
+        in_flight = asyncio.get_running_loop().create_future()
+        _JUDGE_IN_FLIGHT[key] = in_flight
+        try:
+            verdict = await verify_fn(question, target, predicted_answer)
+        except asyncio.CancelledError:
+            in_flight.cancel()
+            raise
+        except Exception as e:
+            in_flight.set_exception(e)
+            in_flight.exception()  # retrieved here in case nobody else waits
+            raise
+        finally:
+            del _JUDGE_IN_FLIGHT[key]
+        in_flight.set_result(verdict)
+
+        # NOT_ATTEMPTED asks for a retry, so it must not be replayed
+        if verdict != "NOT_ATTEMPTED":
+            _JUDGE_CACHE[key] = verdict
+            if len(_JUDGE_CACHE) > _JUDGE_CACHE_SIZE:
+                _JUDGE_CACHE.popitem(last=False)
+        return verdict
+
+    return wrapper
+
+
+def _split_prompt_template(template: str) -> tuple[str, ...]:
+    """
+    Split a str.format template once, so judges fill it in with a join
+    instead of re-parsing the template on every call.
+
+    Returns:
+        The literal text with the field names at the odd indices
+    """
+    parts = [""]
+    for literal, field_name, _, _ in string.Formatter().parse(template):
+        # Escaped braces come back as extra literal chunks without a field
+        parts[-1] += literal
+        if field_name is not None:
+            parts += [field_name, ""]
+    return tuple(parts)
+
+
+def _render_prompt(prompt_parts: tuple[str, ...], **fields) -> str:
+    """Fill a template split by _split_prompt_template, like str.format(**fields)."""
+    parts = list(prompt_parts)
+    parts[1::2] = [str(fields[name]) for name in prompt_parts[1::2]]
+    return "".join(parts)
+
+
+# Errors worth retrying; bad requests and auth failures are raised at once
+_TRANSIENT_JUDGE_ERRORS = (
+    RateLimitError,
+    APIConnectionError,
+    APITimeoutError,
+    InternalServerError,
+)
+
+
+@retry(
+    stop=stop_after_attempt(10),
+    wait=wait_exponential_jitter(initial=1, max=30),
+    retry=retry_if_exception_type(_TRANSIENT_JUDGE_ERRORS),
+    reraise=True,
+)
+async def _create_judge_completion(**kwargs):
+    """Call the judge model, backing off exponentially on transient API errors."""
+    return await evaluation_llm_client.chat.completions.create(**kwargs)
+
+
+async def _run_llm_judge(
+    judge_name: str,
+    prompt_parts: tuple[str, ...],
+    parse_verdict,
+    question: str,
+    target: str,
+    predicted_answer: str,
+    **request_kwargs,
+) -> str:
+    """
+    Ask a gpt-4.1 judge to grade an answer with a single-verdict prompt.
+
+    Args:
+        judge_name: Name used in the judge's log and warning messages
+        prompt_parts: Split prompt with question, correct_answer and response fields
+        parse_verdict: Maps the judge's reply to "CORRECT"/"INCORRECT", or None
+        question: The question being answered
+        target: The correct/target answer
+        predicted_answer: The model's predicted answer
+        request_kwargs: Extra chat.completions.create arguments
+
+    Returns:
+        The verdict, or "NOT_ATTEMPTED" if the reply could not be parsed
+    """
+    prompt = _render_prompt(
+        prompt_parts,
+        question=question,
+        correct_answer=target,
+        response=predicted_answer,
+    )
+
+    try:
+        response = await _create_judge_completion(
+            model="gpt-4.1-2025-04-14",
+            messages=[{"role": "user", "content": prompt}],
+            **request_kwargs,
+        )
+        content = response.choices[0].message.content
+        logger.debug("%s Judge Response: %s", judge_name, content)
+        verdict = parse_verdict(content)
+    except Exception as e:
+        print(f"{judge_name} evaluation failed: {e}")
+        raise e
+
+    if verdict is None:
+        # If no clear verdict is found, return NOT_ATTEMPTED to trigger retry
+        print(f"Warning: Could not parse {judge_name} judge response: {content}")
+        return "NOT_ATTEMPTED"
+    return verdict
+
 
 # ================================================
 # verify_answer_simpleqa
@@ -94,9 +273,9 @@ Also note the following things:
 
 Here is a new example. Simply reply with either CORRECT, INCORRECT, NOT ATTEMPTED. Don't apologize or correct yourself if there was a mistake; we are just trying to grade the answer.
 ```
-Question: {}
-Gold target: {}
-Predicted answer: {}
+Question: {question}
+Gold target: {target}
+Predicted answer: {predicted_answer}
 ```
 
 Grade the predicted answer of this new question as one of:
@@ -107,7 +286,10 @@ C: NOT_ATTEMPTED
 Just return the letters "A", "B", or "C", with no text around it.
 """.strip()
 
+_SIMPLEQA_PROMPT_PARTS = _split_prompt_template(EVALUATION_PROMPT_SIMPLEQA)
+
 
+@_cache_verdicts
 async def verify_answer_simpleqa(
     question: str, target: str, predicted_answer: str
 ) -> str:
@@ -118,8 +300,11 @@ async def verify_answer_simpleqa(
     messages = [
         {
             "role": "user",
-            "content": EVALUATION_PROMPT_SIMPLEQA.format(
-                question, target, predicted_answer
+            "content": _render_prompt(
+                _SIMPLEQA_PROMPT_PARTS,
+                question=question,
+                target=target,
+                predicted_answer=predicted_answer,
             ),
         }
     ]
@@ -130,9 +315,10 @@ async def verify_answer_simpleqa(
             model="gpt-4.1-2025-04-14", messages=messages, max_completion_tokens=2
         )
         content = llm_response.choices[0].message.content
-        match = re.search(r"(A|B|C)", content)
-        if match:
-            return CHOICE_MAP[match.group(0)]
+        # At most 2 tokens come back, so just take the first choice letter
+        for ch in content:
+            if ch in CHOICE_MAP:
+                return CHOICE_MAP[ch]
     except Exception as e:
         print(f"LLM evaluation failed: {e}")
 
@@ -161,6 +347,8 @@ correct: Answer 'yes' if extracted_final_answer matches the [correct_answer] giv
 
 confidence: The extracted confidence score between 0|\%| and 100|\%| from [response]. Put 100 if there is no confidence score available."""
 
+_HLE_PROMPT_PARTS = _split_prompt_template(HLE_JUDGE_PROMPT)
+
 
 class HLEExtractedAnswer(BaseModel):
     extracted_final_answer: str
@@ -170,6 +358,19 @@ class HLEExtractedAnswer(BaseModel):
     strict: Literal[True] = True  # 100% reliability
 
 
+# The strict JSON schema for the judge's structured output, generated once;
+# beta.chat.completions.parse() would rebuild it from the model on every call
+_HLE_RESPONSE_FORMAT = {
+    "type": "json_schema",
+    "json_schema": {
+        "name": HLEExtractedAnswer.__name__,
+        "schema": pydantic_function_tool(HLEExtractedAnswer)["function"]["parameters"],
+        "strict": True,
+    },
+}
+
+
+@_cache_verdicts
 async def verify_answer_hle(question: str, target: str, predicted_answer: str) -> str:
     """
     Use HLE-style LLM judge to verify if the predicted answer is correct.
@@ -183,19 +384,24 @@ async def verify_answer_hle(question: str, target: str, predicted_answer: str) -
     Returns:
         String indicating the evaluation result
     """
-    prompt = HLE_JUDGE_PROMPT.format(
-        question=question, correct_answer=target, response=predicted_answer
+    prompt = _render_prompt(
+        _HLE_PROMPT_PARTS,
+        question=question,
+        correct_answer=target,
+        response=predicted_answer,
     )
 
     try:
-        response = await evaluation_llm_client.beta.chat.completions.parse(
+        response = await evaluation_llm_client.chat.completions.create(
             model="o3-mini-2025-01-31",
             max_completion_tokens=4096,
             messages=[{"role": "user", "content": prompt}],
-            response_format=HLEExtractedAnswer,
+            response_format=_HLE_RESPONSE_FORMAT,
         )
 
-        content = response.choices[0].message.parsed
+        content = HLEExtractedAnswer.model_validate_json(
+            response.choices[0].message.content
+        )
 
         # Print HLE reasoning
         print(f"LLM as Judge Reasoning: {content.reasoning}")
@@ -220,113 +426,135 @@ async def verify_answer_hle(question: str, target: str, predicted_answer: str) -
 # verify_answer_gaia
 # ================================================
 
+# List answers are split on commas and semicolons
+_GAIA_SPLIT_RE = re.compile(r"[,;]")
+_GAIA_PUNCT_TABLE = str.maketrans("", "", string.punctuation)
+_GAIA_PUNCT_BYTES = string.punctuation.encode("ascii")
+_GAIA_LOWER_BYTES = bytes.maketrans(
+    string.ascii_uppercase.encode("ascii"), string.ascii_lowercase.encode("ascii")
+)
+# Units and thousands separators dropped before parsing a number
+_GAIA_NUMBER_STRIP_TABLE = str.maketrans("", "", "$%,")
+# The same targets recur across attempts and runs; both normalizers are pure
+_GAIA_NORMALIZE_CACHE_SIZE = 8192
+
+
+@functools.lru_cache(maxsize=_GAIA_NORMALIZE_CACHE_SIZE)
+def normalize_number_str(number_str: str) -> float | None:
+    # we replace these common units and commas to allow
+    # conversion to float
+    number_str = number_str.translate(_GAIA_NUMBER_STRIP_TABLE)
+    try:
+        return float(number_str)
+    except ValueError:
+        logger.debug("String %s cannot be normalized to number str.", number_str)
+        return None  # Return None instead of inf to handle gracefully
+
+
+def split_string(s: str) -> list[str]:
+    return _GAIA_SPLIT_RE.split(s)
+
+
+@functools.lru_cache(maxsize=_GAIA_NORMALIZE_CACHE_SIZE)
+def normalize_str(input_str, remove_punct=True) -> str:
+    """
+    Normalize a string by:
+    - Removing all white spaces
+    - Optionally removing punctuation (if remove_punct is True)
+    - Converting to lowercase
+    Parameters:
+    - input_str: str, the string to normalize
+    - remove_punct: bool, whether to remove punctuation (default: True)
+    Returns:
+    - str, the normalized string
+    """
+    # Remove all white spaces. Required e.g for seagull vs. sea gull
+    # (str.split() drops exactly the characters re's \s matches)
+    no_spaces = "".join(input_str.split())
+
+    # Remove punctuation, if specified. ASCII answers (the common case) are
+    # lowercased and stripped in a single bytes.translate pass.
+    if remove_punct:
+        if no_spaces.isascii():
+            return (
+                no_spaces.encode("ascii")
+                .translate(_GAIA_LOWER_BYTES, _GAIA_PUNCT_BYTES)
+                .decode("ascii")
+            )
+        return no_spaces.lower().translate(_GAIA_PUNCT_TABLE)
+    else:
+        return no_spaces.lower()
+
+
+def parse_float(element: any) -> float | None:
+    """Parse element as a float, or return None if it is not a number."""
+    try:
+        return float(element)
+    except ValueError:
+        return None
+
+
+def question_scorer(
+    model_answer: str,
+    ground_truth: str,
+) -> bool:
+    if model_answer is None:
+        model_answer = "None"
+
+    # if gt is a number
+    gt_number = parse_float(ground_truth)
+    if gt_number is not None:
+        logger.debug("Evaluating %s as a number.", model_answer)
+        normalized_answer = normalize_number_str(model_answer)
+        # If normalization failed, the answer is incorrect
+        if normalized_answer is None:
+            return False
+        return normalized_answer == gt_number
+
+    # if gt is a list
+    elif "," in ground_truth or ";" in ground_truth:
+        logger.debug("Evaluating %s as a comma separated list.", model_answer)
+        # question with the fish: normalization removes punct
+
+        gt_elems = split_string(ground_truth)
+        ma_elems = split_string(model_answer)
+
+        # check length is the same
+        if len(gt_elems) != len(ma_elems):
+            warnings.warn(
+                "Answer lists have different lengths, returning False.", UserWarning
+            )
+            return False
+
+        # compare each element as float or str, stopping at the first mismatch
+        for ma_elem, gt_elem in zip(ma_elems, gt_elems):
+            gt_elem_number = parse_float(gt_elem)
+            if gt_elem_number is not None:
+                normalized_ma_elem = normalize_number_str(ma_elem)
+                # If normalization failed, this element is incorrect
+                if normalized_ma_elem is None:
+                    return False
+                if normalized_ma_elem != gt_elem_number:
+                    return False
+            else:
+                # we do not remove punct since comparisons can include punct
+                if normalize_str(ma_elem, remove_punct=False) != normalize_str(
+                    gt_elem, remove_punct=False
+                ):
+                    return False
+        return True
+
+    # if gt is a str
+    else:
+        logger.debug("Evaluating %s as a string.", model_answer)
+        return normalize_str(model_answer) == normalize_str(ground_truth)
+
 
 async def verify_answer_gaia(question: str, target: str, predicted_answer: str) -> str:
     """
     Use GAIA-style judge to verify if the predicted answer is correct.
     """
 
-    def normalize_number_str(number_str: str) -> float | None:
-        # we replace these common units and commas to allow
-        # conversion to float
-        for char in ["$", "%", ","]:
-            number_str = number_str.replace(char, "")
-        try:
-            return float(number_str)
-        except ValueError:
-            print(f"String {number_str} cannot be normalized to number str.")
-            return None  # Return None instead of inf to handle gracefully
-
-    def split_string(
-        s: str,
-        char_list: list[str] = [",", ";"],
-    ) -> list[str]:
-        pattern = f"[{''.join(char_list)}]"
-        return re.split(pattern, s)
-
-    def normalize_str(input_str, remove_punct=True) -> str:
-        """
-        Normalize a string by:
-        - Removing all white spaces
-        - Optionally removing punctuation (if remove_punct is True)
-        - Converting to lowercase
-        Parameters:
-        - input_str: str, the string to normalize
-        - remove_punct: bool, whether to remove punctuation (default: True)
-        Returns:
-        - str, the normalized string
-        """
-        # Remove all white spaces. Required e.g for seagull vs. sea gull
-        no_spaces = re.sub(r"\s", "", input_str)
-
-        # Remove punctuation, if specified.
-        if remove_punct:
-            translator = str.maketrans("", "", string.punctuation)
-            return no_spaces.lower().translate(translator)
-        else:
-            return no_spaces.lower()
-
-    def question_scorer(
-        model_answer: str,
-        ground_truth: str,
-    ) -> bool:
-        def is_float(element: any) -> bool:
-            try:
-                float(element)
-                return True
-            except ValueError:
-                return False
-
-        if model_answer is None:
-            model_answer = "None"
-
-        # if gt is a number
-        if is_float(ground_truth):
-            print(f"Evaluating {model_answer} as a number.")
-            normalized_answer = normalize_number_str(model_answer)
-            # If normalization failed, the answer is incorrect
-            if normalized_answer is None:
-                return False
-            return normalized_answer == float(ground_truth)
-
-        # if gt is a list
-        elif any(char in ground_truth for char in [",", ";"]):
-            print(f"Evaluating {model_answer} as a comma separated list.")
-            # question with the fish: normalization removes punct
-
-            gt_elems = split_string(ground_truth)
-            ma_elems = split_string(model_answer)
-
-            # check length is the same
-            if len(gt_elems) != len(ma_elems):
-                warnings.warn(
-                    "Answer lists have different lengths, returning False.", UserWarning
-                )
-                return False
-
-            # compare each element as float or str
-            comparisons = []
-            for ma_elem, gt_elem in zip(ma_elems, gt_elems):
-                if is_float(gt_elem):
-                    normalized_ma_elem = normalize_number_str(ma_elem)
-                    # If normalization failed, this element is incorrect
-                    if normalized_ma_elem is None:
-                        comparisons.append(False)
-                    else:
-                        comparisons.append(normalized_ma_elem == float(gt_elem))
-                else:
-                    # we do not remove punct since comparisons can include punct
-                    comparisons.append(
-                        normalize_str(ma_elem, remove_punct=False)
-                        == normalize_str(gt_elem, remove_punct=False)
-                    )
-            return all(comparisons)
-
-        # if gt is a str
-        else:
-            print(f"Evaluating {model_answer} as a string.")
-            return normalize_str(model_answer) == normalize_str(ground_truth)
-
     # Use the question_scorer to evaluate the answer
     try:
         is_correct = question_scorer(predicted_answer, target)
@@ -357,41 +585,33 @@ Predicted Answer: {response}
 Did the model give an answer **equivalent** to the labeled answer? Please respond with "Correct" if they are equivalent, or "Incorrect" if they are not equivalent. Do not include any other text.
 """
 
+_GAIA_VALIDATION_TEXT_103_PROMPT_PARTS = _split_prompt_template(
+    GAIA_VALIDATION_TEXT_103_SCORER_PROMPT
+)
 
-async def verify_answer_gaia_validation_text_103(
-    question: str, target: str, predicted_answer: str
-) -> str:
-    prompt = GAIA_VALIDATION_TEXT_103_SCORER_PROMPT.format(
-        question=question, correct_answer=target, response=predicted_answer
-    )
-
-    max_tries = 10
-    for attempt in range(max_tries):
-        try:
-            response = await evaluation_llm_client.chat.completions.create(
-                model="gpt-4.1-2025-04-14",
-                messages=[{"role": "user", "content": prompt}],
-            )
-
-            content = response.choices[0].message.content
-            print("LLM Judge Response: ", content)
-
-            if response:
-                break
-        except Exception as e:
-            if attempt == (max_tries - 1):
-                raise e
 
+def _parse_correct_incorrect(content: str) -> str | None:
     # Use case-insensitive matching and strip whitespace/punctuation
     content_normalized = content.strip().rstrip(".").lower()
     if content_normalized == "correct":
         return "CORRECT"
     elif content_normalized == "incorrect":
         return "INCORRECT"
-    else:
-        # If we can't parse the response, default to NOT_ATTEMPTED to trigger retry
-        print(f"Warning: Could not parse judge response: {content}")
-        return "NOT_ATTEMPTED"
+    return None
+
+
+@_cache_verdicts
+async def verify_answer_gaia_validation_text_103(
+    question: str, target: str, predicted_answer: str
+) -> str:
+    return await _run_llm_judge(
+        "GAIA-Text-103",
+        _GAIA_VALIDATION_TEXT_103_PROMPT_PARTS,
+        _parse_correct_incorrect,
+        question,
+        target,
+        predicted_answer,
+    )
 
 
 # ================================================
@@ -470,6 +690,8 @@ B.【错误】
 只返回【正确】、【错误】所代表的选项即可，即仅返回A或B即可，无须添加任何其他的文本。
 """.strip()
 
+_BC_ZH_PROMPT_PARTS = _split_prompt_template(JUDGE_PROMPT_BC_zh)
+
 
 JUDGE_PROMPT_BC_en = """
 Based on the given question, standard answer, and model-predicted answer, evaluate whether the model's response is correct. Your task is to classify the result as: [CORRECT] or [INCORRECT].
@@ -540,7 +762,20 @@ B. [INCORRECT]
 Return only the option representing [CORRECT] or [INCORRECT], i.e., just return A or B, without adding any other text.
 """.strip()
 
+_BC_EN_PROMPT_PARTS = _split_prompt_template(JUDGE_PROMPT_BC_en)
+
+
+def _parse_choice_ab(content: str) -> str | None:
+    # Extract A or B from the (at most 2-token) response
+    for choice in content:
+        if choice == "A":
+            return "CORRECT"
+        elif choice == "B":
+            return "INCORRECT"
+    return None
+
 
+@_cache_verdicts
 async def verify_answer_browsecomp(
     question: str, target: str, predicted_answer: str
 ) -> str:
@@ -549,38 +784,18 @@ async def verify_answer_browsecomp(
     Expects the LLM to return A (correct) or B (incorrect).
     """
 
-    prompt = JUDGE_PROMPT_BC_en.format(
-        question=question, correct_answer=target, response=predicted_answer
+    return await _run_llm_judge(
+        "BrowseComp",
+        _BC_EN_PROMPT_PARTS,
+        _parse_choice_ab,
+        question,
+        target,
+        predicted_answer,
+        max_completion_tokens=2,
     )
 
-    try:
-        response = await evaluation_llm_client.chat.completions.create(
-            model="gpt-4.1-2025-04-14",
-            messages=[{"role": "user", "content": prompt}],
-            max_completion_tokens=2,
-        )
-
-        content = response.choices[0].message.content
-        print(f"BrowseComp Judge Response: {content}")
-
-        # Extract A or B from the response
-        match = re.search(r"[AB]", content)
-        if match:
-            choice = match.group(0)
-            if choice == "A":
-                return "CORRECT"
-            elif choice == "B":
-                return "INCORRECT"
-
-        # If no clear A or B is found, return NOT_ATTEMPTED to trigger retry
-        print(f"Warning: Could not parse BrowseComp judge response: {content}")
-        return "NOT_ATTEMPTED"
-
-    except Exception as e:
-        print(f"BrowseComp evaluation failed: {e}")
-        raise e
-
 
+@_cache_verdicts
 async def verify_answer_browsecomp_zh(
     question: str, target: str, predicted_answer: str
 ) -> str:
@@ -589,37 +804,16 @@ async def verify_answer_browsecomp_zh(
     Expects the LLM to return A (correct) or B (incorrect).
     """
 
-    prompt = JUDGE_PROMPT_BC_zh.format(
-        question=question, correct_answer=target, response=predicted_answer
+    return await _run_llm_judge(
+        "BrowseComp-ZH",
+        _BC_ZH_PROMPT_PARTS,
+        _parse_choice_ab,
+        question,
+        target,
+        predicted_answer,
+        max_completion_tokens=2,
     )
 
-    try:
-        response = await evaluation_llm_client.chat.completions.create(
-            model="gpt-4.1-2025-04-14",
-            messages=[{"role": "user", "content": prompt}],
-            max_completion_tokens=2,
-        )
-
-        content = response.choices[0].message.content
-        print(f"BrowseComp-ZH Judge Response: {content}")
-
-        # Extract A or B from the response
-        match = re.search(r"[AB]", content)
-        if match:
-            choice = match.group(0)
-            if choice == "A":
-                return "CORRECT"
-            elif choice == "B":
-                return "INCORRECT"
-
-        # If no clear A or B is found, return NOT_ATTEMPTED to trigger retry
-        print(f"Warning: Could not parse BrowseComp-ZH judge response: {content}")
-        return "NOT_ATTEMPTED"
-
-    except Exception as e:
-        print(f"BrowseComp-ZH evaluation failed: {e}")
-        raise e
-
 
 # ================================================
 # verify_answer_xbench_deepsearch
@@ -646,7 +840,29 @@ JUDGE_PROMPT_XBENCH = """
 结论: 如果[最终答案]与上方给出的[正确答案]一致, 或者在数值题目中处于可接受的微小误差范围内, 则填写'正确'; 否则（即存在任何不一致、歧义、不等价或提取出的答案错误的情况）填写'错误'。
 """.strip()
 
+_XBENCH_PROMPT_PARTS = _split_prompt_template(JUDGE_PROMPT_XBENCH)
+
+
+# Labelled lines of the XBench judge's reply, matched in one scan. The
+# extract branch captures the rest of its line in a lookahead and only
+# consumes the label, so a conclusion later on the same line is still found,
+# exactly as with one search per label.
+_XBENCH_REPLY_RE = re.compile(
+    r"(?=(?P<extract>最终答案:*.*))最终答案|(?P<correct>结论:*\s*(?:正确|错误))"
+)
 
+
+def _scan_xbench_reply(judge_response: str) -> dict:
+    """Return the first match text for each label of the XBench judge reply."""
+    found = {}
+    for match in _XBENCH_REPLY_RE.finditer(judge_response):
+        found.setdefault(match.lastgroup, match.group(match.lastgroup))
+        if len(found) == 2:
+            break
+    return found
+
+
+@_cache_verdicts
 async def verify_answer_xbench_deepsearch(
     question: str, target: str, predicted_answer: str
 ) -> str:
@@ -657,7 +873,6 @@ async def verify_answer_xbench_deepsearch(
     def parse_match_result(match):
         if match is None:
             return match
-        match = match.group(0)
         try:
             target = match.split(":")[1].strip()
             return target
@@ -667,7 +882,8 @@ async def verify_answer_xbench_deepsearch(
     if predicted_answer is None:
         return "INCORRECT"
 
-    judge_prompt = JUDGE_PROMPT_XBENCH.format(
+    judge_prompt = _render_prompt(
+        _XBENCH_PROMPT_PARTS,
         question=question,
         correct_answer=target,
         response=predicted_answer,
@@ -684,15 +900,9 @@ async def verify_answer_xbench_deepsearch(
         return "NOT_ATTEMPTED"
 
     # Extract grader conclusions
-    extract_match = re.search(r"最终答案:*(.*)", judge_response)
-    extract_match = parse_match_result(extract_match)
-
-    # Fixed regex: make the dot optional with \s* (zero or more whitespace)
-    correct_match = re.search(r"结论:*\s*(正确|错误)", judge_response)
-    correct_match = parse_match_result(correct_match)
-
-    explain_match = re.search(r"解释:*(.*)", judge_response)
-    explain_match = parse_match_result(explain_match)
+    found = _scan_xbench_reply(judge_response)
+    extract_match = parse_match_result(found.get("extract"))
+    correct_match = parse_match_result(found.get("correct"))
 
     # Print debug info
     print(f"XBench Judge - Extract: {extract_match}, Correct: {correct_match}")
@@ -776,6 +986,7 @@ AI assistant response (Wrapped in <response> and </response>):
 
 --------------------
 Rating:"""
+_DEEPSEARCHQA_PROMPT_PARTS = _split_prompt_template(JUDGE_PROMPT_DEEPSEARCHQA)
 
 
 async def verify_answer_deepsearchqa(
@@ -819,7 +1030,8 @@ async def verify_answer_deepsearchqa(
             prompt_type = "Set Answer"
         # Add more mappings if needed
 
-    judge_prompt = JUDGE_PROMPT_DEEPSEARCHQA.format(
+    judge_prompt = _render_prompt(
+        _DEEPSEARCHQA_PROMPT_PARTS,
         prompt_type=prompt_type,
         prompt=question,
         answer=target,
@@ -909,6 +1121,34 @@ async def verify_answer_deepsearchqa(
 # ================================================
 
 
+_GAIA_VALIDATION_TEXT_103_JUDGE = (
+    verify_answer_gaia_validation_text_103,
+    "gaia_validation_text_103_judge",
+)
+_HLE_JUDGE = (verify_answer_hle, "hle_judge")
+_SIMPLEQA_JUDGE = (verify_answer_simpleqa, "simpleqa_judge")
+_DEFAULT_JUDGE = _GAIA_VALIDATION_TEXT_103_JUDGE
+
+# (judge, judge_type) for each benchmark with a dedicated judge
+_DATASET_JUDGES = {
+    # For gaia-validation, use gaia-validation-text-103-scorer
+    # We found that gaia_scorer tends to label many correct answers as incorrect, so we believe
+    # that using an LLM-as-judge approach can more accurately reflect the model’s performance.
+    "gaia-validation": _GAIA_VALIDATION_TEXT_103_JUDGE,
+    "gaia-validation-text-103": _GAIA_VALIDATION_TEXT_103_JUDGE,
+    # For browsecomp (English) and browsecomp-zh (Chinese), use different judges
+    "browsecomp": (verify_answer_browsecomp, "browsecomp_judge"),
+    "browsecomp_zh": (verify_answer_browsecomp_zh, "browsecomp_zh_judge"),
+    # For webwalkerqa, frames, and seal-0, use gaia_validation_text_103_judge
+    "webwalkerqa": _GAIA_VALIDATION_TEXT_103_JUDGE,
+    "frames": _GAIA_VALIDATION_TEXT_103_JUDGE,
+    "seal-0": _GAIA_VALIDATION_TEXT_103_JUDGE,
+    "simpleqa": _SIMPLEQA_JUDGE,
+    "collect_trace": _SIMPLEQA_JUDGE,
+    "xbench_deepsearch": (verify_answer_xbench_deepsearch, "xbench_deepsearch_judge"),
+}
+
+
 async def _verify_answer_for_datasets_core(
     benchmark_name: str,
     question: str,
@@ -936,71 +1176,23 @@ async def _verify_answer_for_datasets_core(
         if predicted_answer == target:
             return "CORRECT", "exact_match", None
 
-    # For gaia-validation, use gaia-validation-text-103-scorer
-    # We found that gaia_scorer tends to label many correct answers as incorrect, so we believe
-    # that using an LLM-as-judge approach can more accurately reflect the model’s performance.
-    if benchmark_name == "gaia-validation":
-        # result = await verify_answer_gaia(question, target, predicted_answer)
-        # return result, "gaia_scorer", None
-        result = await verify_answer_gaia_validation_text_103(
-            question, target, predicted_answer
-        )
-        return result, "gaia_validation_text_103_judge", None
-
-    # For gaia-validation-text-103, use gaia-validation-text-103-scorer
-    elif benchmark_name == "gaia-validation-text-103":
-        result = await verify_answer_gaia_validation_text_103(
-            question, target, predicted_answer
-        )
-        return result, "gaia_validation_text_103_judge", None
-
-    # For browsecomp (English) and browsecomp-zh (Chinese), use different judges
-    elif benchmark_name == "browsecomp":
-        result = await verify_answer_browsecomp(question, target, predicted_answer)
-        return result, "browsecomp_judge", None
-
-    elif benchmark_name == "browsecomp_zh":
-        result = await verify_answer_browsecomp_zh(question, target, predicted_answer)
-        return result, "browsecomp_zh_judge", None
-
-    # For hle, hle-text-500, and hle-text-2158, use hle_judge
-    elif "hle" in benchmark_name:
-        result = await verify_answer_hle(question, target, predicted_answer)
-        return result, "hle_judge", None
-
-    # For webwalkerqa, frames, and seal-0, use gaia_validation_text_103_judge
-    elif benchmark_name in ["webwalkerqa", "frames", "seal-0"]:
-        result = await verify_answer_gaia_validation_text_103(
-            question, target, predicted_answer
-        )
-        return result, "gaia_validation_text_103_judge", None
-
-    # For simpleqa, use simpleqa_judge
-    elif benchmark_name == "simpleqa" or benchmark_name == "collect_trace":
-        result = await verify_answer_simpleqa(question, target, predicted_answer)
-        return result, "simpleqa_judge", None
-
-    # For xbench_deepsearch, use xbench_deepsearch_judge
-    elif benchmark_name == "xbench_deepsearch":
-        result = await verify_answer_xbench_deepsearch(
-            question, target, predicted_answer
-        )
-        return result, "xbench_deepsearch_judge", None
-
     # For deepsearchqa, use deepsearchqa_judge (with metadata support and detailed evaluation)
-    elif benchmark_name == "deepsearchqa":
+    if benchmark_name == "deepsearchqa":
         result, judge_type, details = await verify_answer_deepsearchqa(
             question, target, predicted_answer, metadata
         )
         # Return details for DeepSearchQA-specific metrics calculation
         return result, judge_type, details
 
-    # For other benchmarks, use gaia_validation_text_103_judge
-    else:
-        result = await verify_answer_gaia_validation_text_103(
-            question, target, predicted_answer
-        )
-        return result, "gaia_validation_text_103_judge", None
+    judge = _DATASET_JUDGES.get(benchmark_name)
+    if judge is None:
+        # For hle, hle-text-500, and hle-text-2158, use hle_judge; for other
+        # benchmarks, use gaia_validation_text_103_judge
+        judge = _HLE_JUDGE if "hle" in benchmark_name else _DEFAULT_JUDGE
+
+    verify_fn, judge_type = judge
+    result = await verify_fn(question, target, predicted_answer)
+    return result, judge_type, None
 
 
 async def verify_answer_for_datasets(
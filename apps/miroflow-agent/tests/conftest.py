@@ -0,0 +1,13 @@
+# Copyright (c) 2025 MiroMind
+# This source code is licensed under the Apache 2.0 License.
+
+import os
+import sys
+from pathlib import Path
+
+# The benchmark evaluators are imported as `evaluators.*`, like
+# benchmarks/common_benchmark.py does
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "benchmarks"))
+
+# The judge clients are created at import time and need an API key
+os.environ.setdefault("OPENAI_API_KEY", "test-key")
@@ -0,0 +1,83 @@
+# Copyright (c) 2025 MiroMind
+# This source code is licensed under the Apache 2.0 License.
+
+import asyncio
+from collections import OrderedDict
+from types import SimpleNamespace
+
+import pytest
+from evaluators import eval_utils
+
+
+class FakeJudgeClient:
+    """Stands in for the AsyncOpenAI judge client, replying with a fixed text."""
+
+    def __init__(self, reply: str, delay: float = 0.0):
+        self.reply = reply
+        self.delay = delay
+        self.calls = 0
+        self.chat = SimpleNamespace(completions=SimpleNamespace(create=self.create))
+
+    async def create(self, **kwargs):
+        self.calls += 1
+        await asyncio.sleep(self.delay)
+        return SimpleNamespace(
+            choices=[SimpleNamespace(message=SimpleNamespace(content=self.reply))]
+        )
+
+
+@pytest.fixture(autouse=True)
+def empty_judge_cache(monkeypatch):
+    monkeypatch.setattr(eval_utils, "_JUDGE_CACHE", OrderedDict())
+    monkeypatch.setattr(eval_utils, "_JUDGE_IN_FLIGHT", {})
+
+
+def _use_judge(monkeypatch, reply: str, delay: float = 0.0) -> FakeJudgeClient:
+    client = FakeJudgeClient(reply, delay)
+    monkeypatch.setattr(eval_utils, "evaluation_llm_client", client)
+    return client
+
+
+def _verify(question="q", target="t", answer="a") -> str:
+    return asyncio.run(eval_utils.verify_answer_browsecomp(question, target, answer))
+
+
+def test_repeated_verdict_skips_the_api(monkeypatch):
+    client = _use_judge(monkeypatch, "A")
+    assert _verify() == "CORRECT"
+    assert _verify() == "CORRECT"
+    assert client.calls == 1
+
+
+def test_not_attempted_is_not_replayed(monkeypatch):
+    client = _use_judge(monkeypatch, "unparseable")
+    assert _verify() == "NOT_ATTEMPTED"
+    assert _verify() == "NOT_ATTEMPTED"
+    assert client.calls == 2
+
+
+def test_concurrent_duplicates_share_one_call(monkeypatch):
+    client = _use_judge(monkeypatch, "B", delay=0.05)
+
+    async def verify_twice():
+        return await asyncio.gather(
+            eval_utils.verify_answer_browsecomp("q", "t", "a"),
+            eval_utils.verify_answer_browsecomp("q", "t", "a"),
+        )
+
+    assert asyncio.run(verify_twice()) == ["INCORRECT", "INCORRECT"]
+    assert client.calls == 1
+    assert not eval_utils._JUDGE_IN_FLIGHT
+
+
+def test_least_recently_used_verdict_is_evicted(monkeypatch):
+    monkeypatch.setattr(eval_utils, "_JUDGE_CACHE_SIZE", 2)
+    client = _use_judge(monkeypatch, "A")
+    for answer in ("a1", "a2", "a1", "a3"):
+        _verify(answer=answer)
+    assert client.calls == 3
+    # a2 was the least recently used entry when a3 was added
+    _verify(answer="a1")
+    assert client.calls == 3
+    _verify(answer="a2")
+    assert client.calls == 4